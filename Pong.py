@@ -1,14 +1,14 @@
 import pygame
 import sys
+import argparse
+import itertools
 import random
-
-# Initialize pygame
-pygame.init()
+import struct
+import time
+import zlib
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Two-Player Pong")
 
 # Colors
 BACKGROUND = (10, 20, 30)
@@ -26,10 +26,48 @@ BALL_SIZE = 15
 PADDLE_SPEED = 7
 BALL_SPEED_X = 5
 BALL_SPEED_Y = 5
+MAX_BOUNCES = 16  # Contacts resolved per ball step before giving up on the rest of it
+WINNING_SCORE = 5
+
+# Timing: the simulation always advances in steps of 1 / TICK_RATE seconds
+TICK_RATE = 60
+MAX_FRAME_TIME = 0.25  # Longer hitches are dropped instead of fast-forwarded
+DEFAULT_FPS = 144
+
+# Replay files: header, then (inputs, repeat count) byte pairs with the
+# left paddle's bits in the low three bits of inputs, then a trailer
+REPLAY_MAGIC = b'PONGRPL1'
+REPLAY_HEADER = struct.Struct('<8sq')  # magic, serve seed (signed, like --seed)
+REPLAY_TRAILER = struct.Struct('<QI')  # ticks, checksum after the last tick
+MAX_RUN = 255
+
+# Input bits for one paddle on one tick
+INPUT_UP = 1
+INPUT_DOWN = 2
+INPUT_RESET = 4
 
-# Font
-font = pygame.font.SysFont(None, 74)
-small_font = pygame.font.SysFont(None, 36)
+# Display and fonts, created by init_display() so the simulation can run headless
+screen = None
+font = None
+small_font = None
+background = None  # Static layer from build_background()
+score_surfaces = {}
+game_over_surfaces = {}
+
+def init_display(caption="Two-Player Pong"):
+    global screen, font, small_font
+    
+    # Initialize pygame
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(caption)
+    
+    # Font
+    font = pygame.font.SysFont(None, 74)
+    small_font = pygame.font.SysFont(None, 36)
+    score_surfaces.clear()
+    game_over_surfaces.clear()
+    build_background()
 
 class Paddle:
     def __init__(self, x, y, width, height, color):
@@ -50,55 +88,428 @@ class Paddle:
         if self.rect.bottom > HEIGHT:
             self.rect.bottom = HEIGHT
     
-    def draw(self):
-        pygame.draw.rect(screen, self.color, self.rect)
-        pygame.draw.rect(screen, (255, 255, 255), self.rect, 2)  # Border
+    def draw(self, rect=None):
+        rect = rect or self.rect  # Interpolated position, if given
+        pygame.draw.rect(screen, self.color, rect)
+        pygame.draw.rect(screen, (255, 255, 255), rect, 2)  # Border
+
+class AIPaddle(Paddle):
+    """Computer-controlled paddle that aims for where the ball will cross its face.
+
+    The crossing point is solved in closed form, folding the straight-line
+    path back into the court for every wall bounce, so each frame is O(1).
+    It reacts reaction_delay frames after the ball changes course and aims
+    with a random error of up to `error` pixels.
+    """
+    
+    def __init__(self, x, y, width, height, color, reaction_delay=10, error=20):
+        super().__init__(x, y, width, height, color)
+        self.reaction_delay = reaction_delay
+        self.error = error
+        self.prediction = None
+        self.countdown = 0
+        self.target_y = HEIGHT / 2
+    
+    def predict_y(self, ball):
+        """Ball centre y when it reaches this paddle, or None if it is heading away."""
+        if (self.rect.centerx - (ball.x + ball.size / 2)) * ball.dx <= 0:
+            return None
+        contact_x = self.rect.left - ball.size if ball.dx > 0 else self.rect.right
+        t = max(0.0, (contact_x - ball.x) / ball.dx)
+        
+        # Reflections off the top and bottom walls fold y into [0, span]
+        span = HEIGHT - ball.size
+        y = (ball.y + ball.dy * t) % (2 * span)
+        if y > span:
+            y = 2 * span - y
+        return y + ball.size / 2
+    
+    def think(self, ball):
+        """Pick this frame's move: "up", "down" or None."""
+        prediction = self.predict_y(ball)
+        # Wall bounces leave the prediction unchanged; paddle hits and serves don't
+        changed = (prediction is None) != (self.prediction is None) or \
+            (prediction is not None and abs(prediction - self.prediction) > 1)
+        if changed:
+            self.prediction = prediction
+            self.countdown = self.reaction_delay + 1
+        if self.countdown > 0:
+            self.countdown -= 1
+            if self.countdown == 0:
+                if self.prediction is None:
+                    self.target_y = HEIGHT / 2  # Drift back to the middle
+                else:
+                    self.target_y = self.prediction + random.uniform(-self.error, self.error)
+        
+        diff = self.target_y - self.rect.centery
+        if diff < -self.speed / 2:
+            return "up"
+        if diff > self.speed / 2:
+            return "down"
+        return None
+
+def make_paddles(left_class=Paddle, right_class=Paddle, **ai_settings):
+    """Both paddles in their starting places; ai_settings (reaction_delay, error) go to AIPaddles."""
+    paddles = []
+    for paddle_class, x in ((left_class, 30), (right_class, WIDTH - 30 - PADDLE_WIDTH)):
+        settings = ai_settings if issubclass(paddle_class, AIPaddle) else {}
+        paddles.append(paddle_class(x, HEIGHT // 2 - PADDLE_HEIGHT // 2, PADDLE_WIDTH, PADDLE_HEIGHT,
+                                    PADDLE_COLOR, **settings))
+    return paddles
 
 class Ball:
-    def __init__(self, x, y, size):
+    def __init__(self, x, y, size, rng=random):
         self.rect = pygame.Rect(x, y, size, size)
         self.size = size
         self.color = BALL_COLOR
+        self.rng = rng  # Seeded for deterministic serves
         self.reset()
     
     def reset(self):
+        # Exact position is kept in floats; rect is only used for drawing
+        self.x = WIDTH / 2 - self.size / 2
+        self.y = HEIGHT / 2 - self.size / 2
         self.rect.center = (WIDTH // 2, HEIGHT // 2)
-        self.dx = BALL_SPEED_X * random.choice([-1, 1])
-        self.dy = BALL_SPEED_Y * random.choice([-1, 1])
+        self.dx = BALL_SPEED_X * self.rng.choice([-1, 1])
+        self.dy = BALL_SPEED_Y * self.rng.choice([-1, 1])
     
-    def move(self):
-        self.rect.x += self.dx
-        self.rect.y += self.dy
+    def time_to_hit(self, rect, limit):
+        """Swept AABB test: when (in frames, up to limit) the ball first touches rect, or None."""
+        # Entry and exit times along each axis
+        if self.dx > 0:
+            x_entry = (rect.left - (self.x + self.size)) / self.dx
+            x_exit = (rect.right - self.x) / self.dx
+        elif self.dx < 0:
+            x_entry = (rect.right - self.x) / self.dx
+            x_exit = (rect.left - (self.x + self.size)) / self.dx
+        elif rect.left < self.x + self.size and self.x < rect.right:
+            x_entry, x_exit = float('-inf'), float('inf')
+        else:
+            return None
         
-        # Bounce off top and bottom walls
-        if self.rect.top <= 0 or self.rect.bottom >= HEIGHT:
-            self.dy *= -1
+        if self.dy > 0:
+            y_entry = (rect.top - (self.y + self.size)) / self.dy
+            y_exit = (rect.bottom - self.y) / self.dy
+        elif self.dy < 0:
+            y_entry = (rect.bottom - self.y) / self.dy
+            y_exit = (rect.top - (self.y + self.size)) / self.dy
+        elif rect.top < self.y + self.size and self.y < rect.bottom:
+            y_entry, y_exit = float('-inf'), float('inf')
+        else:
+            return None
+        
+        entry = max(x_entry, y_entry)
+        exit = min(x_exit, y_exit)
+        if entry >= exit or entry > limit or exit <= 0:
+            return None
+        # Already overlapping (e.g. a paddle moved onto the ball): hit right away
+        return max(entry, 0.0)
+    
+    def bounce_off_paddle(self, paddle):
+        self.dx *= -1.1  # Increase speed slightly and reverse direction
+        # Add vertical angle based on where ball hits paddle
+        relative_y = (paddle.rect.centery - (self.y + self.size / 2)) / (PADDLE_HEIGHT / 2)
+        self.dy = -relative_y * BALL_SPEED_Y
+    
+    def move(self, paddles=(), dt=1.0):
+        """Advance dt frames, resolving every wall and paddle contact at its exact time.
+        
+        Contacts are found by time of impact rather than overlap, so the
+        ball cannot tunnel through a paddle however fast it goes.
+        """
+        remaining = dt
+        for _ in range(MAX_BOUNCES):
+            hit_time, hit = remaining, None
+            
+            # Top and bottom walls
+            if self.dy < 0:
+                wall_time = max(0.0, -self.y / self.dy)
+            elif self.dy > 0:
+                wall_time = max(0.0, (HEIGHT - self.size - self.y) / self.dy)
+            else:
+                wall_time = None
+            if wall_time is not None and wall_time < hit_time:
+                hit_time, hit = wall_time, 'wall'
+            
+            # Only paddles the ball is heading towards can be hit
+            for paddle in paddles:
+                if (paddle.rect.centerx - (self.x + self.size / 2)) * self.dx <= 0:
+                    continue
+                paddle_time = self.time_to_hit(paddle.rect, hit_time)
+                if paddle_time is not None and (paddle_time < hit_time or hit is None):
+                    hit_time, hit = paddle_time, paddle
+            
+            self.x += self.dx * hit_time
+            self.y += self.dy * hit_time
+            remaining -= hit_time
+            
+            if hit is None:
+                break
+            if hit == 'wall':
+                # Bounce off top and bottom walls
+                self.dy *= -1
+            else:
+                self.bounce_off_paddle(hit)
+        
+        self.sync_rect()
     
-    def draw(self):
-        pygame.draw.ellipse(screen, self.color, self.rect)
-        pygame.draw.ellipse(screen, (255, 255, 255), self.rect, 2)  # Border
+    def sync_rect(self):
+        # Paddle hits speed the ball up without limit, and the swept collision stays exact,
+        # but a ball that scores can end its step far past the edge; the rect is only drawn,
+        # so keep it within pygame.Rect's integer range
+        self.rect.x = round(min(max(self.x, -WIDTH), 2 * WIDTH))
+        self.rect.y = round(min(max(self.y, -HEIGHT), 2 * HEIGHT))
+    
+    def draw(self, rect=None):
+        rect = rect or self.rect  # Interpolated position, if given
+        pygame.draw.ellipse(screen, self.color, rect)
+        pygame.draw.ellipse(screen, (255, 255, 255), rect, 2)  # Border
 
-def draw_net():
-    for y in range(0, HEIGHT, 20):
-        pygame.draw.rect(screen, NET_COLOR, (WIDTH // 2 - 2, y, 4, 10))
+def collide_balls(a, b):
+    """Elastic collision between two equal balls; returns whether they touched."""
+    nx = b.x - a.x
+    ny = b.y - a.y
+    distance_sq = nx * nx + ny * ny
+    size = (a.size + b.size) / 2
+    if distance_sq >= size * size or distance_sq == 0:
+        return False
+    distance = distance_sq ** 0.5
+    nx /= distance
+    ny /= distance
+    
+    # Swap the velocity components along the line between the centres if they approach
+    approach = (a.dx - b.dx) * nx + (a.dy - b.dy) * ny
+    if approach > 0:
+        a.dx -= approach * nx
+        a.dy -= approach * ny
+        b.dx += approach * nx
+        b.dy += approach * ny
+    
+    # Push them apart so they don't stay stuck together
+    push = (size - distance) / 2
+    a.x -= push * nx
+    a.y -= push * ny
+    b.x += push * nx
+    b.y += push * ny
+    return True
 
-def draw_scores(player1, player2):
-    # Player 1 score (left)
-    p1_score = font.render(str(player1.score), True, PLAYER1_COLOR)
-    screen.blit(p1_score, (WIDTH // 4, 20))
+def grid_pairs(balls, cell_size):
+    """Uniform-grid broadphase: pairs of balls in the same or neighbouring cells.
     
-    # Player 2 score (right)
-    p2_score = font.render(str(player2.score), True, PLAYER2_COLOR)
-    screen.blit(p2_score, (3 * WIDTH // 4 - p2_score.get_width(), 20))
+    With cells at least one ball wide, balls further apart than that can't
+    touch, so each cell is only paired with itself and four neighbours.
+    """
+    grid = {}
+    for ball in balls:
+        grid.setdefault((int(ball.x // cell_size), int(ball.y // cell_size)), []).append(ball)
+    for (cx, cy), cell in grid.items():
+        yield from itertools.combinations(cell, 2)
+        for neighbour in ((cx + 1, cy), (cx - 1, cy + 1), (cx, cy + 1), (cx + 1, cy + 1)):
+            other = grid.get(neighbour)
+            if other:
+                yield from itertools.product(cell, other)
+
+def direction_bits(direction):
+    """Input bits for a Paddle.move direction ("up", "down" or None)."""
+    return INPUT_UP if direction == "up" else INPUT_DOWN if direction == "down" else 0
+
+class Match:
+    """Paddles, ball, score and result, advanced one tick at a time by step().
+
+    The simulation only depends on the seed and the per-tick inputs, so
+    snapshot()/restore() plus replaying inputs reproduce any tick exactly.
+    """
+    
+    def __init__(self, player1=None, player2=None, seed=None):
+        if player1 is None or player2 is None:
+            left, right = make_paddles()
+            player1, player2 = player1 or left, player2 or right
+        self.player1 = player1
+        self.player2 = player2
+        self.seed = random.getrandbits(63) if seed is None else seed  # Known, so matches can be replayed
+        self.ball = Ball(WIDTH // 2, HEIGHT // 2, BALL_SIZE, random.Random(self.seed))
+        self.balls = [self.ball]  # Everything draw_frame draws; StressMatch adds more
+        self.game_over = False
+        self.winner = ""
+    
+    def reset(self):
+        self.player1.score = 0
+        self.player2.score = 0
+        self.ball.reset()
+        self.game_over = False
+        self.winner = ""
+    
+    def step(self, input1, input2):
+        """Advance one tick with each paddle's INPUT_* bits."""
+        player1, player2, ball = self.player1, self.player2, self.ball
+        if (input1 | input2) & INPUT_RESET:
+            # Reset game
+            self.reset()
+        if self.game_over:
+            return
+        self.move_paddles(input1, input2)
+        
+        # Move the ball, bouncing off walls and paddles
+        ball.move((player1, player2))
+        
+        # Scoring
+        if ball.x <= 0:
+            player2.score += 1
+            ball.reset()
+            if player2.score >= WINNING_SCORE:
+                self.game_over = True
+                self.winner = "Player 2"
+        
+        if ball.x + ball.size >= WIDTH:
+            player1.score += 1
+            ball.reset()
+            if player1.score >= WINNING_SCORE:
+                self.game_over = True
+                self.winner = "Player 1"
+    
+    def move_paddles(self, input1, input2):
+        """Player controls: each paddle moves up, then down, as its INPUT_* bits say."""
+        for paddle, bits in ((self.player1, input1), (self.player2, input2)):
+            if bits & INPUT_UP:
+                paddle.move("up")
+            if bits & INPUT_DOWN:
+                paddle.move("down")
     
+    def target_ball(self, paddle):
+        """The ball an AIPaddle should watch."""
+        return self.ball
+    
+    def positions(self):
+        """What interpolation needs from the previous tick: paddle tops, ball position, scores."""
+        return (self.player1.rect.y, self.player2.rect.y, self.ball.x, self.ball.y,
+                self.player1.score, self.player2.score)
+    
+    def snapshot(self):
+        ball = self.ball
+        return (self.player1.rect.y, self.player1.score, self.player2.rect.y, self.player2.score,
+                ball.x, ball.y, ball.dx, ball.dy, self.game_over, self.winner, ball.rng.getstate())
+    
+    def restore(self, snapshot):
+        ball = self.ball
+        (self.player1.rect.y, self.player1.score, self.player2.rect.y, self.player2.score,
+         ball.x, ball.y, ball.dx, ball.dy, self.game_over, self.winner, rng_state) = snapshot
+        ball.rng.setstate(rng_state)
+        ball.sync_rect()
+    
+    def checksum(self, snapshot=None):
+        """CRC of the current (or a snapshotted) state, for comparing two copies of a match."""
+        if snapshot is None:
+            snapshot = self.snapshot()
+        return zlib.crc32(struct.pack('<4i4d?', *snapshot[:9]))
+
+class StressMatch(Match):
+    """Load test: many balls bouncing off the paddles and each other.
+    
+    Balls that get past a paddle score and are served again from a random
+    point on the centre line; there is no winner. Every tick's update time
+    is kept in update_times.
+    """
+    
+    def __init__(self, count, player1=None, player2=None, seed=None, broadphase='grid'):
+        super().__init__(player1, player2, seed)
+        rng = self.ball.rng
+        self.balls += [Ball(WIDTH // 2, HEIGHT // 2, BALL_SIZE, rng) for _ in range(count - 1)]
+        for ball in self.balls:
+            self.serve(ball)
+        self.broadphase = broadphase
+        self.cell_size = BALL_SIZE * 2
+        self.update_times = []
+        self.pair_tests = 0
+        self.contacts = 0
+    
+    def serve(self, ball):
+        ball.reset()
+        ball.y = ball.rng.uniform(0, HEIGHT - ball.size)
+    
+    def reset(self):
+        self.player1.score = 0
+        self.player2.score = 0
+        for ball in self.balls:
+            self.serve(ball)
+    
+    def target_ball(self, paddle):
+        """The ball that will reach paddle first, for AIPaddle.think."""
+        best, best_time = self.ball, float('inf')
+        for ball in self.balls:
+            if (paddle.rect.centerx - (ball.x + ball.size / 2)) * ball.dx > 0:
+                time_left = abs(paddle.rect.centerx - ball.x) / abs(ball.dx)
+                if time_left < best_time:
+                    best, best_time = ball, time_left
+        return best
+    
+    def step(self, input1, input2):
+        start = time.perf_counter()
+        player1, player2 = self.player1, self.player2
+        if (input1 | input2) & INPUT_RESET:
+            self.reset()
+        self.move_paddles(input1, input2)
+        
+        for ball in self.balls:
+            ball.move((player1, player2))
+        
+        # Ball-ball contacts
+        if self.broadphase == 'grid':
+            pairs = grid_pairs(self.balls, self.cell_size)
+        else:
+            pairs = itertools.combinations(self.balls, 2)
+        for a, b in pairs:
+            self.pair_tests += 1
+            if collide_balls(a, b):
+                self.contacts += 1
+        
+        # Scoring
+        for ball in self.balls:
+            if ball.x <= 0:
+                player2.score += 1
+                self.serve(ball)
+            elif ball.x + ball.size >= WIDTH:
+                player1.score += 1
+                self.serve(ball)
+            else:
+                # Collisions may have pushed it off the court; walls take it from there
+                ball.y = min(max(ball.y, 0.0), HEIGHT - ball.size)
+                ball.sync_rect()
+        
+        self.update_times.append(time.perf_counter() - start)
+        if len(self.update_times) % TICK_RATE == 0:
+            recent = self.update_times[-TICK_RATE:]
+            report = (f"{len(self.balls)} balls: update {sum(recent) / len(recent) * 1000:.2f} ms avg, "
+                      f"{max(recent) * 1000:.2f} ms max")
+            if pygame.display.get_surface():
+                pygame.display.set_caption(f"Pong stress test - {report}")
+    
+    def positions(self):
+        return None  # Too many balls to interpolate; draw each tick as it is
+    
+    def report(self):
+        """Summary of the per-tick update times."""
+        times = sorted(self.update_times)
+        if not times:
+            return f"{len(self.balls)} balls: no ticks run"
+        ticks = len(times)
+        return (f"{len(self.balls)} balls, {self.broadphase} broadphase, {ticks} ticks: update "
+                f"{sum(times) / ticks * 1000:.2f} ms avg, {times[ticks // 2] * 1000:.2f} ms p50, "
+                f"{times[min(ticks - 1, int(ticks * 0.99))] * 1000:.2f} ms p99, {times[-1] * 1000:.2f} ms max; "
+                f"{self.pair_tests / ticks:,.0f} pair tests and {self.contacts / ticks:.1f} contacts per tick")
+
+def draw_net(surface):
+    for y in range(0, HEIGHT, 20):
+        pygame.draw.rect(surface, NET_COLOR, (WIDTH // 2 - 2, y, 4, 10))
+
+def draw_labels(surface):
     # Player labels
     p1_label = small_font.render("Player 1", True, PLAYER1_COLOR)
-    screen.blit(p1_label, (WIDTH // 4 - p1_label.get_width() // 2, 80))
+    surface.blit(p1_label, (WIDTH // 4 - p1_label.get_width() // 2, 80))
     
     p2_label = small_font.render("Player 2", True, PLAYER2_COLOR)
-    screen.blit(p2_label, (3 * WIDTH // 4 - p2_label.get_width() // 2, 80))
+    surface.blit(p2_label, (3 * WIDTH // 4 - p2_label.get_width() // 2, 80))
 
-def draw_instructions():
+def draw_instructions(surface):
     instructions = [
         "Player 1: W/S keys",
         "Player 2: UP/DOWN arrows",
@@ -108,117 +519,308 @@ def draw_instructions():
     
     for i, text in enumerate(instructions):
         rendered = small_font.render(text, True, (180, 180, 200))
-        screen.blit(rendered, (WIDTH // 2 - rendered.get_width() // 2, HEIGHT - 120 + i * 30))
+        surface.blit(rendered, (WIDTH // 2 - rendered.get_width() // 2, HEIGHT - 120 + i * 30))
+
+def build_background():
+    """Compose everything that never moves (net, labels, instructions) into one surface."""
+    global background
+    background = pygame.Surface((WIDTH, HEIGHT)).convert()
+    background.fill(BACKGROUND)
+    draw_net(background)
+    draw_labels(background)
+    draw_instructions(background)
+
+def score_surface(score, color):
+    """Rendered score digits, cached per (score, color)."""
+    key = (score, color)
+    if key not in score_surfaces:
+        score_surfaces[key] = font.render(str(score), True, color).convert_alpha()
+    return score_surfaces[key]
+
+def draw_scores(player1, player2):
+    # Player 1 score (left)
+    p1_score = score_surface(player1.score, PLAYER1_COLOR)
+    screen.blit(p1_score, (WIDTH // 4, 20))
+    
+    # Player 2 score (right)
+    p2_score = score_surface(player2.score, PLAYER2_COLOR)
+    screen.blit(p2_score, (3 * WIDTH // 4 - p2_score.get_width(), 20))
+
+def game_over_surface(winner):
+    """Dimmed overlay with the result text, built once per winner."""
+    if winner not in game_over_surfaces:
+        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 200))
+        
+        game_over_text = font.render("GAME OVER", True, TEXT_COLOR)
+        winner_text = font.render(f"{winner} Wins!", True, 
+                                  PLAYER1_COLOR if winner == "Player 1" else PLAYER2_COLOR)
+        restart_text = small_font.render("Press R to Restart", True, TEXT_COLOR)
+        
+        overlay.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, HEIGHT // 2 - 60))
+        overlay.blit(winner_text, (WIDTH // 2 - winner_text.get_width() // 2, HEIGHT // 2))
+        overlay.blit(restart_text, (WIDTH // 2 - restart_text.get_width() // 2, HEIGHT // 2 + 60))
+        game_over_surfaces[winner] = overlay.convert_alpha()
+    return game_over_surfaces[winner]
 
 def draw_game_over(winner):
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 200))
-    screen.blit(overlay, (0, 0))
+    screen.blit(game_over_surface(winner), (0, 0))
+
+def lerp(a, b, alpha):
+    return a + (b - a) * alpha
+
+def draw_frame(match, previous=None, alpha=1.0):
+    """Draw match, blended alpha of the way from the previous tick's positions() to now."""
+    # Static layer: background, net, labels and instructions
+    screen.blit(background, (0, 0))
+    
+    # Draw scores
+    draw_scores(match.player1, match.player2)
     
-    game_over_text = font.render("GAME OVER", True, TEXT_COLOR)
-    winner_text = font.render(f"{winner} Wins!", True, 
-                              PLAYER1_COLOR if winner == "Player 1" else PLAYER2_COLOR)
-    restart_text = small_font.render("Press R to Restart", True, TEXT_COLOR)
+    # Draw paddles and ball
+    if previous is None or alpha >= 1.0:
+        match.player1.draw()
+        match.player2.draw()
+        for ball in match.balls:
+            ball.draw()
+    else:
+        p1_y, p2_y, ball_x, ball_y, p1_score, p2_score = previous
+        for paddle, y in ((match.player1, p1_y), (match.player2, p2_y)):
+            paddle.draw(paddle.rect.move(0, round(lerp(y, paddle.rect.y, alpha)) - paddle.rect.y))
+        ball = match.ball
+        if (p1_score, p2_score) == (match.player1.score, match.player2.score):
+            # Don't slide the ball back from the serve spot after a point
+            ball.draw(pygame.Rect(round(lerp(ball_x, ball.x, alpha)), round(lerp(ball_y, ball.y, alpha)),
+                                  ball.size, ball.size))
+        else:
+            ball.draw()
     
-    screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, HEIGHT // 2 - 60))
-    screen.blit(winner_text, (WIDTH // 2 - winner_text.get_width() // 2, HEIGHT // 2))
-    screen.blit(restart_text, (WIDTH // 2 - restart_text.get_width() // 2, HEIGHT // 2 + 60))
+    # Draw game over screen if needed
+    if match.game_over:
+        draw_game_over(match.winner)
+    
+    # Update display
+    pygame.display.flip()
+
+def read_keys(keys, up_key, down_key):
+    """Input bits for a human paddle from pygame.key.get_pressed()."""
+    return (INPUT_UP if keys[up_key] else 0) | (INPUT_DOWN if keys[down_key] else 0)
 
-def main():
-    # Create game objects
-    player1 = Paddle(30, HEIGHT // 2 - PADDLE_HEIGHT // 2, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_COLOR)
-    player2 = Paddle(WIDTH - 30 - PADDLE_WIDTH, HEIGHT // 2 - PADDLE_HEIGHT // 2, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_COLOR)
-    ball = Ball(WIDTH // 2, HEIGHT // 2, BALL_SIZE)
+class ReplayRecorder:
+    """Writes a match's serve seed and every tick's inputs to a replay file."""
+    
+    def __init__(self, path, match):
+        self.match = match
+        self.file = open(path, 'wb')
+        self.file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, match.seed))
+        self.ticks = 0
+        self.inputs = None
+        self.run = 0
+    
+    def record(self, input1, input2):
+        inputs = input1 | input2 << 3
+        if inputs == self.inputs and self.run < MAX_RUN:
+            self.run += 1
+        else:
+            self.write_run()
+            self.inputs, self.run = inputs, 1
+        self.ticks += 1
+    
+    def write_run(self):
+        if self.run:
+            self.file.write(bytes((self.inputs, self.run)))
     
+    def close(self):
+        if self.file:
+            self.write_run()
+            self.file.write(REPLAY_TRAILER.pack(self.ticks, self.match.checksum()))
+            self.file.close()
+            self.file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def load_replay(path):
+    """Read a replay file; returns (seed, inputs packed one byte per tick, checksum)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < REPLAY_HEADER.size + REPLAY_TRAILER.size or data[:len(REPLAY_MAGIC)] != REPLAY_MAGIC:
+        raise ValueError(f"{path} is not a Pong replay")
+    _, seed = REPLAY_HEADER.unpack_from(data)
+    ticks, checksum = REPLAY_TRAILER.unpack_from(data, len(data) - REPLAY_TRAILER.size)
+    runs = data[REPLAY_HEADER.size:len(data) - REPLAY_TRAILER.size]
+    inputs = b''.join(bytes((runs[i],)) * runs[i + 1] for i in range(0, len(runs) - 1, 2))
+    if len(inputs) != ticks:
+        raise ValueError(f"{path} is damaged: {len(inputs)} of {ticks} ticks present")
+    return seed, inputs, checksum
+
+def play(match, next_inputs, fps=DEFAULT_FPS, recorder=None):
+    """Fixed-timestep game loop.
+    
+    next_inputs(keys, reset) returns the two paddles' input bits for the
+    next tick, or None once there are no more (the last frame stays up).
+    """
     clock = pygame.time.Clock()
-    game_over = False
-    winner = ""
+    tick = 1 / TICK_RATE
+    accumulator = 0.0
+    previous = match.positions()
+    last_time = time.perf_counter()
+    reset = 0
     
-    # Main game loop
+    # Main game loop: fixed simulation ticks, rendering as often as fps allows
     while True:
+        now = time.perf_counter()
+        accumulator += min(now - last_time, MAX_FRAME_TIME)
+        last_time = now
+        
         # Event handling
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                if recorder:
+                    recorder.close()
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
-                    # Reset game
-                    player1.score = 0
-                    player2.score = 0
-                    ball.reset()
-                    game_over = False
-                    winner = ""
-        
-        if not game_over:
-            # Player controls
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_w]:
-                player1.move("up")
-            if keys[pygame.K_s]:
-                player1.move("down")
-            if keys[pygame.K_UP]:
-                player2.move("up")
-            if keys[pygame.K_DOWN]:
-                player2.move("down")
-            
-            # Move the ball
-            ball.move()
-            
-            # Ball collision with paddles
-            if ball.rect.colliderect(player1.rect) and ball.dx < 0:
-                ball.dx *= -1.1  # Increase speed slightly and reverse direction
-                # Add vertical angle based on where ball hits paddle
-                relative_y = (player1.rect.centery - ball.rect.centery) / (PADDLE_HEIGHT / 2)
-                ball.dy = -relative_y * BALL_SPEED_Y
-            
-            if ball.rect.colliderect(player2.rect) and ball.dx > 0:
-                ball.dx *= -1.1  # Increase speed slightly and reverse direction
-                # Add vertical angle based on where ball hits paddle
-                relative_y = (player2.rect.centery - ball.rect.centery) / (PADDLE_HEIGHT / 2)
-                ball.dy = -relative_y * BALL_SPEED_Y
-            
-            # Scoring
-            if ball.rect.left <= 0:
-                player2.score += 1
-                ball.reset()
-                if player2.score >= 5:
-                    game_over = True
-                    winner = "Player 2"
-            
-            if ball.rect.right >= WIDTH:
-                player1.score += 1
-                ball.reset()
-                if player1.score >= 5:
-                    game_over = True
-                    winner = "Player 1"
-        
-        # Drawing
-        screen.fill(BACKGROUND)
+                    reset = INPUT_RESET
         
-        # Draw net
-        draw_net()
+        # Run as many ticks as the elapsed time covers, so a slow frame doesn't slow the game
+        keys = pygame.key.get_pressed()
+        while accumulator >= tick:
+            inputs = next_inputs(keys, reset)
+            if inputs is None:
+                accumulator = 0.0
+                previous = None
+                break
+            previous = match.positions()
+            match.step(*inputs)
+            if recorder:
+                recorder.record(*inputs)
+            reset = 0
+            accumulator -= tick
         
-        # Draw paddles and ball
-        player1.draw()
-        player2.draw()
-        ball.draw()
-        
-        # Draw scores
-        draw_scores(player1, player2)
-        
-        # Draw instructions
-        draw_instructions()
-        
-        # Draw game over screen if needed
-        if game_over:
-            draw_game_over(winner)
-        
-        # Update display
-        pygame.display.flip()
+        draw_frame(match, previous, accumulator / tick)
         
         # Cap the frame rate
-        clock.tick(60)
+        clock.tick(fps)
+
+def main(cpu=None, reaction_delay=10, error=20, fps=DEFAULT_FPS, record=None, seed=None,
+         balls=1, broadphase='grid'):
+    init_display()
+    
+    # Create game objects (cpu is None, "1", "2" or "both")
+    player1, player2 = make_paddles(AIPaddle if cpu in ("1", "both") else Paddle,
+                                    AIPaddle if cpu in ("2", "both") else Paddle,
+                                    reaction_delay=reaction_delay, error=error)
+    if balls > 1:
+        match = StressMatch(balls, player1, player2, seed, broadphase)
+    else:
+        match = Match(player1, player2, seed)
+    
+    def next_inputs(keys, reset):
+        # Player controls
+        inputs = []
+        for paddle, up_key, down_key in ((player1, pygame.K_w, pygame.K_s),
+                                         (player2, pygame.K_UP, pygame.K_DOWN)):
+            if isinstance(paddle, AIPaddle):
+                inputs.append(direction_bits(paddle.think(match.target_ball(paddle))))
+            else:
+                inputs.append(read_keys(keys, up_key, down_key))
+        return inputs[0] | reset, inputs[1]
+    
+    try:
+        if record:
+            with ReplayRecorder(record, match) as recorder:
+                play(match, next_inputs, fps, recorder)
+        else:
+            play(match, next_inputs, fps)
+    finally:
+        if isinstance(match, StressMatch):
+            print(match.report())
+
+def record_headless(path, ticks, reaction_delay=10, error=20, seed=None):
+    """Record a computer-vs-computer match of the given length without a display."""
+    player1, player2 = make_paddles(AIPaddle, AIPaddle, reaction_delay=reaction_delay, error=error)
+    match = Match(player1, player2, seed)
+    with ReplayRecorder(path, match) as recorder:
+        for _ in range(ticks):
+            input1 = direction_bits(player1.think(match.ball))
+            input2 = direction_bits(player2.think(match.ball))
+            if match.game_over:
+                input1 |= INPUT_RESET  # Start the next match right away
+            match.step(input1, input2)
+            recorder.record(input1, input2)
+    print(f"Recorded {ticks} ticks to {path}")
+
+def stress_headless(balls, ticks, broadphase='grid', seed=None, reaction_delay=10, error=20):
+    """Run a computer-vs-computer StressMatch without a display and report update times."""
+    player1, player2 = make_paddles(AIPaddle, AIPaddle, reaction_delay=reaction_delay, error=error)
+    match = StressMatch(balls, player1, player2, seed, broadphase)
+    for _ in range(ticks):
+        match.step(direction_bits(player1.think(match.target_ball(player1))),
+                   direction_bits(player2.think(match.target_ball(player2))))
+    print(match.report())
+
+def replay(path, headless=False, fps=DEFAULT_FPS):
+    """Play a replay back; returns whether it ended in the recorded state."""
+    seed, inputs, checksum = load_replay(path)
+    match = Match(seed=seed)
+    if headless:
+        # Fast-forward with no display at all
+        start = time.perf_counter()
+        for packed in inputs:
+            match.step(packed & 7, packed >> 3)
+        elapsed = time.perf_counter() - start
+        matches = match.checksum() == checksum
+        print(f"{len(inputs)} ticks in {elapsed:.3f}s ({len(inputs) / max(elapsed, 1e-9):,.0f} ticks/s), "
+              f"score {match.player1.score}-{match.player2.score}, "
+              f"{'checksum matches' if matches else 'CHECKSUM MISMATCH'}")
+        return matches
+    
+    init_display("Pong Replay")
+    ticks = iter(inputs)
+    
+    def next_inputs(keys, reset):
+        packed = next(ticks, None)
+        return None if packed is None else (packed & 7, packed >> 3)
+    
+    play(match, next_inputs, fps)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Two-Player Pong")
+    parser.add_argument("--cpu", choices=["1", "2", "both"], help="let the computer control these paddles")
+    parser.add_argument("--reaction-delay", type=int, default=10, help="computer reaction time in frames")
+    parser.add_argument("--error", type=float, default=20, help="computer aiming error in pixels")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS,
+                        help=f"render rate cap (the game itself always runs at {TICK_RATE} ticks/s; 0 for uncapped)")
+    parser.add_argument("--seed", type=int, default=None, help="serve seed")
+    parser.add_argument("--record", metavar="FILE", help="save the match's inputs to a replay file")
+    parser.add_argument("--replay", metavar="FILE", help="play back a replay file")
+    parser.add_argument("--balls", type=int, default=1, help="stress test with this many colliding balls")
+    parser.add_argument("--broadphase", choices=["grid", "pairs"], default="grid",
+                        help="how stress mode finds touching balls: uniform grid or all pairs")
+    parser.add_argument("--headless", action="store_true",
+                        help="no display: fast-forward --replay, record a computer match of --ticks with "
+                             "--record, or run --balls for --ticks")
+    parser.add_argument("--ticks", type=int, default=TICK_RATE * 600, help="length of a headless run")
+    args = parser.parse_args()
+    if args.seed is not None and not -2 ** 63 <= args.seed < 2 ** 63:
+        parser.error("--seed must fit in a signed 64-bit integer")
+    if args.balls > 1 and (args.record or args.replay):
+        parser.error("replays don't support --balls")
+    if args.replay:
+        if replay(args.replay, args.headless, args.fps) is False:
+            sys.exit(1)
+    elif args.headless:
+        if args.balls > 1:
+            stress_headless(args.balls, args.ticks, args.broadphase, args.seed, args.reaction_delay, args.error)
+        elif args.record:
+            record_headless(args.record, args.ticks, args.reaction_delay, args.error, args.seed)
+        else:
+            parser.error("--headless needs --replay, --record or --balls")
+    else:
+        main(args.cpu, args.reaction_delay, args.error, args.fps, args.record, args.seed,
+             args.balls, args.broadphase)
@@ -1,10 +1,9 @@
 import pygame
 import sys
+import argparse
 import random
 import math
-
-# Initialize pygame
-pygame.init()
+from collections import deque
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
@@ -26,23 +25,35 @@ GAME_OVER_BG = (0, 0, 0, 180)
 FPS = 10
 INITIAL_LENGTH = 3
 
-# Create the screen
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Nokia Snake")
-clock = pygame.time.Clock()
+# What Snake.advance did
+MOVED, ATE, DIED, WON = "moved", "ate", "died", "won"
+
+# Screen, clock and fonts, created by init_display() so the game logic can run headless
+screen = None
+clock = None
+font_large = None
+font_medium = None
+font_small = None
 
-# Font setup
-font_large = pygame.font.SysFont("Arial", 48, bold=True)
-font_medium = pygame.font.SysFont("Arial", 32, bold=True)
-font_small = pygame.font.SysFont("Arial", 24)
+# Static layer (grid, border, title, instructions), rebuilt by build_background() on resize
+background = None
+score_cache = (None, None)  # (score, rendered text)
 
 class Snake:
-    def __init__(self):
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
         self.reset()
         
     def reset(self):
         self.length = INITIAL_LENGTH
-        self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
+        # Body from head to tail, plus how many body segments sit on each cell
+        self.positions = deque([(self.width // 2, self.height // 2)])
+        self.occupied = bytearray(self.width * self.height)
+        # Unoccupied cell indices in any order, and where each cell sits in that list (-1 if occupied)
+        self.free_cells = list(range(self.width * self.height))
+        self.free_slot = list(range(self.width * self.height))
+        self.enter(self.cell_index(self.positions[0]))
         self.direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
         self.score = 0
         self.grow_to = INITIAL_LENGTH
@@ -52,24 +63,72 @@ class Snake:
     def get_head_position(self):
         return self.positions[0]
     
-    def update(self, current_time):
+    def cell_index(self, position):
+        return position[1] * self.width + position[0]
+    
+    def enter(self, index):
+        """A body segment moves onto cell index."""
+        if not self.occupied[index]:
+            # Swap-remove it from the free list
+            slot = self.free_slot[index]
+            last = self.free_cells.pop()
+            if last != index:
+                self.free_cells[slot] = last
+                self.free_slot[last] = slot
+            self.free_slot[index] = -1
+        self.occupied[index] += 1
+    
+    def leave(self, index):
+        """A body segment moves off cell index."""
+        self.occupied[index] -= 1
+        if not self.occupied[index]:
+            self.free_slot[index] = len(self.free_cells)
+            self.free_cells.append(index)
+    
+    def random_free_cell(self, rng=random):
+        """A uniformly random cell the snake isn't on, or None when it fills the board."""
+        if not self.free_cells:
+            return None
+        index = self.free_cells[rng.randrange(len(self.free_cells))]
+        return (index % self.width, index // self.width)
+    
+    def update(self, current_time, food):
+        """Advance once the move delay has passed; returns the outcome, or None while waiting."""
         if current_time - self.last_move_time > self.move_delay:
             self.last_move_time = current_time
-            head = self.get_head_position()
-            x, y = self.direction
-            new_x = (head[0] + x) % GRID_WIDTH
-            new_y = (head[1] + y) % GRID_HEIGHT
-            new_position = (new_x, new_y)
+            return self.advance(food)
+        return None
+    
+    def advance(self, food):
+        """Move one cell and eat the food if the head lands on it; returns MOVED, ATE, DIED or WON."""
+        if not self.step():
+            return DIED
+        if self.get_head_position() != food.position:
+            return MOVED
+        self.grow()
+        # Food only goes on free cells; when there are none the board is full
+        if not food.randomize_position(self):
+            return WON
+        return ATE
+    
+    def step(self):
+        """Move one cell; returns False if the snake ran into itself."""
+        head = self.get_head_position()
+        x, y = self.direction
+        new_x = (head[0] + x) % self.width
+        new_y = (head[1] + y) % self.height
+        new_position = (new_x, new_y)
+        
+        # Check for collision with self (the tail still counts, it moves after the head)
+        if self.occupied[new_y * self.width + new_x]:
+            return False
             
-            # Check for collision with self
-            if new_position in self.positions[1:]:
-                return False
-                
-            self.positions.insert(0, new_position)
+        self.positions.appendleft(new_position)
+        self.enter(new_y * self.width + new_x)
+        
+        if len(self.positions) > self.grow_to:
+            self.leave(self.cell_index(self.positions.pop()))
             
-            if len(self.positions) > self.grow_to:
-                self.positions.pop()
-                
         return True
     
     def change_direction(self, direction):
@@ -128,13 +187,21 @@ class Snake:
                 pygame.draw.circle(surface, (0, 0, 0), (right_eye_x, right_eye_y), eye_size)
 
 class Food:
-    def __init__(self):
+    def __init__(self, snake=None):
         self.position = (0, 0)
-        self.randomize_position()
+        self.randomize_position(snake)
         
-    def randomize_position(self):
+    def randomize_position(self, snake=None):
+        """Move to a random cell, one the snake isn't on if given; False if there is none."""
+        if snake is not None:
+            position = snake.random_free_cell()
+            if position is None:
+                return False
+            self.position = position
+            return True
         self.position = (random.randint(0, GRID_WIDTH - 1), 
                          random.randint(0, GRID_HEIGHT - 1))
+        return True
     
     def draw(self, surface):
         rect = pygame.Rect(self.position[0] * GRID_SIZE, self.position[1] * GRID_SIZE, 
@@ -155,17 +222,23 @@ def draw_grid(surface):
             pygame.draw.rect(surface, GRID_COLOR, rect, 1)
 
 def draw_score(surface, score):
-    score_text = font_medium.render(f"Score: {score}", True, TEXT_COLOR)
-    surface.blit(score_text, (20, 20))
+    global score_cache
+    # Only re-render when the score changes
+    if score_cache[0] != score:
+        score_cache = (score, font_medium.render(f"Score: {score}", True, TEXT_COLOR))
+    surface.blit(score_cache[1], (20, 20))
 
-def draw_game_over(surface, score):
+def draw_game_over(surface, score, won=False):
     # Semi-transparent overlay
     overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
     overlay.fill(GAME_OVER_BG)
     surface.blit(overlay, (0, 0))
     
     # Game over text
-    game_over_text = font_large.render("GAME OVER", True, (220, 60, 60))
+    if won:
+        game_over_text = font_large.render("YOU WIN!", True, SNAKE_HEAD)
+    else:
+        game_over_text = font_large.render("GAME OVER", True, (220, 60, 60))
     score_text = font_medium.render(f"Final Score: {score}", True, TEXT_COLOR)
     restart_text = font_small.render("Press SPACE to play again", True, TEXT_COLOR)
     
@@ -189,10 +262,46 @@ def draw_instructions(surface):
         inst_text = font_small.render(text, True, TEXT_COLOR)
         surface.blit(inst_text, (WIDTH - inst_text.get_width() - 20, 20 + i * 30))
 
-def main():
+def init_display():
+    global screen, clock, font_large, font_medium, font_small
+    
+    # Initialize pygame
+    pygame.init()
+    
+    # Create the screen
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
+    pygame.display.set_caption("Nokia Snake")
+    clock = pygame.time.Clock()
+    
+    # Font setup
+    font_large = pygame.font.SysFont("Arial", 48, bold=True)
+    font_medium = pygame.font.SysFont("Arial", 32, bold=True)
+    font_small = pygame.font.SysFont("Arial", 24)
+
+def build_background(size):
+    """Bake everything that never changes into one surface the size of the window."""
+    global background
+    background = pygame.Surface(size).convert()
+    background.fill(BACKGROUND)
+    draw_grid(background)
+    draw_title(background)
+    draw_instructions(background)
+    
+    # Draw border
+    pygame.draw.rect(background, BORDER_COLOR, (0, 0, WIDTH, HEIGHT), 4)
+
+def main(autopilot=False):
+    global screen
+    init_display()
+    build_background(screen.get_size())
     snake = Snake()
-    food = Food()
+    food = Food(snake)
     game_over = False
+    won = False
+    bot = None
+    if autopilot:
+        from snake_bot import Autopilot
+        bot = Autopilot(snake)
     
     # Main game loop
     while True:
@@ -203,12 +312,20 @@ def main():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            
+            if event.type == pygame.VIDEORESIZE:
+                # The board keeps its size; the background is rebuilt to fill the new window
+                screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
+                build_background(event.size)
                 
             if event.type == pygame.KEYDOWN:
                 if game_over and event.key == pygame.K_SPACE:
                     snake.reset()
-                    food.randomize_position()
+                    food.randomize_position(snake)
                     game_over = False
+                    won = False
+                    if bot:
+                        bot.reset()
                 elif event.key == pygame.K_ESCAPE:
                     pygame.quit()
                     sys.exit()
@@ -223,37 +340,32 @@ def main():
                     elif event.key == pygame.K_RIGHT:
                         snake.change_direction((1, 0))
         
-        # Drawing
-        screen.fill(BACKGROUND)
-        draw_grid(screen)
-        draw_title(screen)
-        draw_instructions(screen)
+        # Drawing: one blit for the static layer
+        screen.blit(background, (0, 0))
         draw_score(screen, snake.score)
         
         if not game_over:
-            # Update snake position
-            if not snake.update(current_time):
+            # Let the autopilot steer just before each move
+            if bot and current_time - snake.last_move_time > snake.move_delay:
+                snake.change_direction(bot.choose_direction(food.position))
+            
+            # Update snake position, eating any food it reaches
+            outcome = snake.update(current_time, food)
+            if outcome in (DIED, WON):
                 game_over = True
-                
-            # Check for food collision
-            if snake.get_head_position() == food.position:
-                snake.grow()
-                food.randomize_position()
-                # Make sure food doesn't appear on snake
-                while food.position in snake.positions:
-                    food.randomize_position()
+                won = outcome == WON
             
             # Draw game objects
             food.draw(screen)
             snake.draw(screen)
         else:
-            draw_game_over(screen, snake.score)
-        
-        # Draw border
-        pygame.draw.rect(screen, BORDER_COLOR, (0, 0, WIDTH, HEIGHT), 4)
+            draw_game_over(screen, snake.score, won)
         
         pygame.display.flip()
         clock.tick(FPS)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Nokia Snake")
+    parser.add_argument("--autopilot", action="store_true", help="let the computer steer (see snake_bot.py)")
+    args = parser.parse_args()
+    main(args.autopilot)
\ No newline at end of file
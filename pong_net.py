@@ -0,0 +1,381 @@
+import argparse
+import heapq
+import random
+import socket
+import struct
+import subprocess
+import sys
+import time
+
+import pygame
+from Pong import (AIPaddle, INPUT_DOWN, INPUT_RESET, INPUT_UP, Match, Paddle, TICK_RATE, direction_bits,
+                  draw_frame, init_display, make_paddles)
+
+# Datagrams (host = player 1, client = player 2):
+#   H                  client hello, repeated until the host answers
+#   S <seed>           host start; both sides simulate from frame 0 with this serve seed
+#   I <header> <bits>  a window of the sender's inputs not yet acked by the receiver
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8766
+INPUT_DELAY = 3       # Frames between reading a local input and simulating it
+MAX_PREDICTION = 8    # Frames we may simulate past the last confirmed remote input
+MAX_WINDOW = 64       # Inputs per packet
+CHECKSUM_INTERVAL = 30
+SKIP_INTERVAL = 10    # Frames between time-sync skips
+PEER_TIMEOUT = 5.0
+
+START = struct.Struct('<cq')  # type, serve seed (signed, like --seed)
+INPUT_HEADER = struct.Struct('<ciiihiIB')  # type, frame, ack, start, advantage, checksum frame, checksum, count
+
+class LossyLink:
+    """UDP sender that delays and drops datagrams to fake a bad network.
+
+    Each datagram waits rtt/2 +- jitter before it goes out, so two peers
+    using the same settings see the requested round trip time.
+    """
+
+    def __init__(self, sock, rtt_ms=0.0, jitter_ms=0.0, loss=0.0, seed=None):
+        self.sock = sock
+        self.delay = rtt_ms / 2000
+        self.jitter = jitter_ms / 1000
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.queue = []
+        self.sequence = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, data, addr):
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        due = time.perf_counter() + max(0.0, self.delay + self.rng.uniform(-self.jitter, self.jitter))
+        heapq.heappush(self.queue, (due, self.sequence, data, addr))
+        self.sequence += 1
+        self.flush()
+
+    def flush(self):
+        """Send every datagram whose delay has passed."""
+        now = time.perf_counter()
+        while self.queue and self.queue[0][0] <= now:
+            _, _, data, addr = heapq.heappop(self.queue)
+            try:
+                self.sock.sendto(data, addr)
+                self.sent += 1
+            except OSError:
+                self.dropped += 1
+
+class RollbackSession:
+    """Input-delayed, rolled-back copy of one Match, independent of the transport.
+
+    Local inputs are scheduled INPUT_DELAY frames ahead. Missing remote
+    inputs are predicted by repeating the last confirmed one; when the real
+    input turns out different, the match is restored to the snapshot taken
+    before that frame and every frame since is simulated again.
+    """
+
+    def __init__(self, match, local_player, input_delay=INPUT_DELAY, max_prediction=MAX_PREDICTION):
+        self.match = match
+        self.local_player = local_player  # 0 plays the left paddle, 1 the right
+        self.input_delay = input_delay
+        self.max_prediction = max_prediction
+        self.frame = 0  # Next frame to simulate
+        # Frames before the delay kicks in have no input on either side
+        self.local_inputs = dict.fromkeys(range(input_delay), 0)
+        self.remote_inputs = dict.fromkeys(range(input_delay), 0)
+        self.last_remote_frame = input_delay - 1  # Every remote input up to here is known
+        self.peer_ack = input_delay - 1          # Every local input up to here reached the peer
+        self.remote_frame = 0
+        self.remote_advantage = 0
+        self.snapshots = {}
+        self.predicted = {}  # Frames simulated with a guessed remote input -> the guess
+        self.rollback_frame = None
+        self.checksums = {}
+        self.remote_checksums = {}
+        self.latest_checksum = (-1, 0)
+        self.rollbacks = 0
+        self.resimulated = 0
+        self.max_rollback = 0
+        self.checksums_compared = 0
+        self.desyncs = 0
+
+    @property
+    def advantage(self):
+        """Frames we run ahead of the peer, as last reported by it."""
+        return self.frame - self.remote_frame
+
+    def time_sync(self):
+        """Half the difference of both advantages; positive means we should wait."""
+        return (self.advantage - self.remote_advantage) / 2
+
+    def can_advance(self):
+        return self.frame <= self.last_remote_frame + self.max_prediction
+
+    def add_local_input(self, bits):
+        self.local_inputs[self.frame + self.input_delay] = bits
+
+    def add_remote_input(self, frame, bits):
+        if frame <= self.last_remote_frame or frame in self.remote_inputs:
+            return
+        self.remote_inputs[frame] = bits
+        if frame < self.frame and self.predicted.get(frame) != bits:
+            if self.rollback_frame is None or frame < self.rollback_frame:
+                self.rollback_frame = frame
+        while self.last_remote_frame + 1 in self.remote_inputs:
+            self.last_remote_frame += 1
+
+    def _simulate(self, frame):
+        self.snapshots[frame] = self.match.snapshot()
+        remote = self.remote_inputs.get(frame)
+        if remote is None:
+            # Predict: hold the last known direction, but never repeat a reset
+            remote = self.remote_inputs[self.last_remote_frame] & ~INPUT_RESET
+            self.predicted[frame] = remote
+        else:
+            self.predicted.pop(frame, None)
+        local = self.local_inputs.get(frame, 0)
+        if self.local_player == 0:
+            self.match.step(local, remote)
+        else:
+            self.match.step(remote, local)
+
+    def synchronize(self):
+        """Replay from the earliest mispredicted frame, if any."""
+        if self.rollback_frame is None:
+            return
+        start, self.rollback_frame = self.rollback_frame, None
+        self.match.restore(self.snapshots[start])
+        for frame in range(start, self.frame):
+            self._simulate(frame)
+        self.rollbacks += 1
+        self.resimulated += self.frame - start
+        self.max_rollback = max(self.max_rollback, self.frame - start)
+
+    def advance(self):
+        """Simulate the next frame, rolling back first if a prediction failed."""
+        self.synchronize()
+        self._simulate(self.frame)
+        self.frame += 1
+
+        # Snapshots up to the last confirmed frame are final
+        checksum_frame = self.latest_checksum[0] + CHECKSUM_INTERVAL if self.latest_checksum[0] >= 0 \
+            else CHECKSUM_INTERVAL
+        if checksum_frame <= self.last_remote_frame and checksum_frame in self.snapshots:
+            checksum = self.match.checksum(self.snapshots[checksum_frame])
+            self.checksums[checksum_frame] = checksum
+            self.latest_checksum = (checksum_frame, checksum)
+            self._compare(checksum_frame)
+
+        if self.frame % TICK_RATE == 0:
+            self._prune()
+
+    def _compare(self, frame):
+        if frame in self.checksums and frame in self.remote_checksums:
+            self.checksums_compared += 1
+            if self.checksums.pop(frame) != self.remote_checksums.pop(frame):
+                self.desyncs += 1
+
+    def _prune(self):
+        """Forget inputs and snapshots that can no longer be rolled back to or resent."""
+        for table, limit in ((self.snapshots, self.last_remote_frame),
+                             (self.predicted, self.last_remote_frame),
+                             (self.remote_inputs, self.last_remote_frame),
+                             (self.local_inputs, min(self.peer_ack, self.last_remote_frame) + 1)):
+            for frame in [frame for frame in table if frame < limit]:
+                del table[frame]
+        for table in (self.checksums, self.remote_checksums):
+            for frame in [frame for frame in table if frame < self.latest_checksum[0] - 10 * CHECKSUM_INTERVAL]:
+                del table[frame]
+
+    def encode(self):
+        """Input packet carrying every local input the peer has not acked yet."""
+        start = self.peer_ack + 1
+        inputs = bytes(self.local_inputs[frame] for frame in range(start, self.frame + self.input_delay)
+                       if frame in self.local_inputs)[:MAX_WINDOW]
+        checksum_frame, checksum = self.latest_checksum
+        advantage = max(-32768, min(32767, self.advantage))
+        return INPUT_HEADER.pack(b'I', self.frame, self.last_remote_frame, start, advantage,
+                                 checksum_frame, checksum, len(inputs)) + inputs
+
+    def decode(self, data):
+        _, frame, ack, start, advantage, checksum_frame, checksum, count = INPUT_HEADER.unpack_from(data)
+        self.remote_frame = max(self.remote_frame, frame)
+        self.remote_advantage = advantage
+        self.peer_ack = max(self.peer_ack, ack)
+        for offset, bits in enumerate(data[INPUT_HEADER.size:INPUT_HEADER.size + count]):
+            self.add_remote_input(start + offset, bits)
+        if checksum_frame >= 0:
+            self.remote_checksums[checksum_frame] = checksum
+            self._compare(checksum_frame)
+
+def connect(sock, link, role, peer, seed):
+    """Handshake; returns (peer address, seed)."""
+    deadline = time.perf_counter() + 30
+    next_hello = 0.0
+    while time.perf_counter() < deadline:
+        link.flush()
+        if role == 'client' and time.perf_counter() >= next_hello:
+            link.send(b'H', peer)
+            next_hello = time.perf_counter() + 0.1
+        try:
+            data, addr = sock.recvfrom(2048)
+        except BlockingIOError:
+            time.sleep(0.001)
+            continue
+        if role == 'host' and data[:1] == b'H':
+            link.send(START.pack(b'S', seed), addr)
+            return addr, seed
+        if role == 'client' and data[:1] == b'S':
+            return addr, START.unpack(data)[1]
+    raise TimeoutError("No peer answered within 30s")
+
+def make_match(role, cpu, seed):
+    """Match whose local paddle is an AIPaddle when the computer plays it."""
+    left, right = make_paddles(AIPaddle if cpu and role == 'host' else Paddle,
+                               AIPaddle if cpu and role == 'client' else Paddle)
+    return Match(left, right, seed)
+
+def run(role, host, port, frames=None, headless=False, cpu=False, rtt_ms=0.0, jitter_ms=0.0,
+        loss=0.0, input_delay=INPUT_DELAY, seed=None):
+    """Play one networked match; returns the final checksum when frames is given."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port) if role == 'host' else (host, 0))
+    sock.setblocking(False)
+    link = LossyLink(sock, rtt_ms, jitter_ms, loss)
+    if seed is None:
+        seed = random.getrandbits(63)
+    print(f"{role}: waiting for peer" if role == 'host' else f"{role}: connecting to {host}:{port}", flush=True)
+    peer, seed = connect(sock, link, role, (host, port), seed)
+
+    cpu = cpu or headless
+    local_player = 0 if role == 'host' else 1
+    match = make_match(role, cpu, seed)
+    session = RollbackSession(match, local_player, input_delay)
+    paddle = match.player1 if local_player == 0 else match.player2
+    if not headless:
+        init_display(f"Networked Pong ({'Player 1' if local_player == 0 else 'Player 2'})")
+
+    tick = 1 / TICK_RATE
+    start = time.perf_counter()
+    next_tick = start
+    last_heard = start
+    last_skip = 0
+    stalls = skips = 0
+    finished_at = None
+    reset = 0
+    while True:
+        # Drain the socket
+        while True:
+            try:
+                data, addr = sock.recvfrom(2048)
+            except BlockingIOError:
+                break
+            except ConnectionError:
+                continue
+            last_heard = time.perf_counter()
+            if data[:1] == b'I':
+                session.decode(data)
+            elif data[:1] == b'H' and role == 'host':
+                link.send(START.pack(b'S', seed), addr)  # Our START was lost
+        link.flush()
+
+        now = time.perf_counter()
+        if now - last_heard > PEER_TIMEOUT:
+            raise TimeoutError(f"Peer silent for {PEER_TIMEOUT:.0f}s at frame {session.frame}")
+
+        if not headless:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                    reset = INPUT_RESET
+
+        if frames is not None and session.frame >= frames:
+            # Done once every input is confirmed; keep talking a little longer so the peer finishes too
+            if session.last_remote_frame >= frames - 1 and finished_at is None:
+                session.synchronize()
+                finished_at = now
+                checksum = match.checksum()
+                elapsed = now - start
+            if finished_at is not None and now - finished_at > max(1.0, 4 * rtt_ms / 1000):
+                break
+            if now >= next_tick:
+                link.send(session.encode(), peer)
+                next_tick = now + tick
+            time.sleep(0.001)
+            continue
+
+        if now < next_tick:
+            time.sleep(min(next_tick - now, 0.001))
+            continue
+        next_tick = max(next_tick + tick, now - tick)  # Don't race to catch up after a hiccup
+
+        if session.time_sync() >= 1 and session.frame - last_skip >= SKIP_INTERVAL:
+            # Running ahead of the peer: wait a tick so it catches up
+            last_skip = session.frame
+            skips += 1
+        elif not session.can_advance():
+            stalls += 1
+        else:
+            if isinstance(paddle, AIPaddle):
+                bits = direction_bits(paddle.think(match.ball))
+            else:
+                keys = pygame.key.get_pressed()
+                bits = ((INPUT_UP if keys[pygame.K_w] or keys[pygame.K_UP] else 0)
+                        | (INPUT_DOWN if keys[pygame.K_s] or keys[pygame.K_DOWN] else 0))
+            session.add_local_input(bits | reset)
+            reset = 0
+            session.advance()
+        link.send(session.encode(), peer)
+
+        if not headless:
+            draw_frame(match)
+
+    sock.close()
+    print(f"{role}: {frames} frames in {elapsed:.2f}s ({frames / elapsed:.1f} ticks/s), "
+          f"{session.rollbacks} rollbacks, {session.resimulated} frames resimulated "
+          f"(max {session.max_rollback}), {stalls} stalls, {skips} skips", flush=True)
+    print(f"{role}: {link.sent} datagrams sent, {link.dropped} dropped, "
+          f"{session.checksums_compared} checksums compared, {session.desyncs} desyncs", flush=True)
+    print(f"{role}: score {match.player1.score}-{match.player2.score} final checksum {checksum:08x}", flush=True)
+    return checksum
+
+def selftest(port, frames, rtt_ms, jitter_ms, loss):
+    """Run a headless host and client over loopback and check they ended in the same state."""
+    common = ['--port', str(port), '--headless', '--frames', str(frames), '--rtt', str(rtt_ms),
+              '--jitter', str(jitter_ms), '--loss', str(loss)]
+    host = subprocess.Popen([sys.executable, __file__, 'host', *common], stdout=subprocess.PIPE, text=True)
+    time.sleep(0.2)
+    client = subprocess.Popen([sys.executable, __file__, 'client', *common], stdout=subprocess.PIPE, text=True)
+    checksums = []
+    for process in (host, client):
+        output, _ = process.communicate()
+        print(output, end='')
+        checksums += [line.split()[-1] for line in output.splitlines() if 'final checksum' in line]
+    ok = host.returncode == 0 and client.returncode == 0 and len(checksums) == 2 and checksums[0] == checksums[1]
+    print("Peers agree" if ok else "Peers DISAGREE")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Two-player Pong over UDP with rollback netcode")
+    parser.add_argument("role", choices=['host', 'client', 'selftest'],
+                        help="host plays the left paddle, client the right; selftest runs both headless")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to bind (host) or connect to (client)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--frames", type=int, default=None, help="stop after this many frames")
+    parser.add_argument("--headless", action='store_true', help="no window; the computer plays the local paddle")
+    parser.add_argument("--cpu", action='store_true', help="the computer plays the local paddle")
+    parser.add_argument("--delay", type=int, default=INPUT_DELAY, help="input delay in frames")
+    parser.add_argument("--seed", type=int, default=None, help="serve seed (host only)")
+    parser.add_argument("--rtt", type=float, default=0.0, help="simulated round trip time in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="simulated one-way jitter in ms")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of datagrams to drop")
+    args = parser.parse_args()
+    if args.seed is not None and not -2 ** 63 <= args.seed < 2 ** 63:
+        parser.error("--seed must fit in a signed 64-bit integer")
+
+    if args.role == 'selftest':
+        sys.exit(0 if selftest(args.port, args.frames or 1800, args.rtt or 150.0, args.jitter, args.loss) else 1)
+    run(args.role, args.host, args.port, args.frames, args.headless, args.cpu,
+        args.rtt, args.jitter, args.loss, args.delay, args.seed)
@@ -0,0 +1,188 @@
+import argparse
+import time
+
+import numpy as np
+
+from Pong import (BALL_SIZE, BALL_SPEED_X, BALL_SPEED_Y, HEIGHT, INPUT_DOWN, INPUT_UP, MAX_BOUNCES,
+                  PADDLE_HEIGHT, PADDLE_SPEED, PADDLE_WIDTH, WIDTH, WINNING_SCORE)
+
+# Left edge of each paddle, as placed by Pong.main
+PADDLE_X = np.array([30, WIDTH - 30 - PADDLE_WIDTH])
+OBSERVATION_SIZE = 6
+# What a ball meets first in one sweep of _move_balls (otherwise the paddle side, 0 or 1)
+NO_HIT, WALL = -1, -2
+
+class VecPong:
+    """N independent Pong matches stepped together, one array per field.
+
+    Follows Pong.Match.step: paddles move first, then the ball is swept
+    against the walls and every paddle it is heading towards, bouncing
+    with the same relative_y rule. Finished matches start over on the next step.
+    """
+
+    def __init__(self, games, seed=None):
+        self.games = games
+        self.rng = np.random.default_rng(seed)
+        self.paddle_y = np.full((games, 2), HEIGHT // 2 - PADDLE_HEIGHT // 2, dtype=np.int64)
+        self.scores = np.zeros((games, 2), dtype=np.int64)
+        self.ball_x = np.empty(games)
+        self.ball_y = np.empty(games)
+        self.ball_dx = np.empty(games)
+        self.ball_dy = np.empty(games)
+        self.serve(np.arange(games))
+
+    def serve(self, index):
+        """Put the ball back in the middle of the given games with a random diagonal."""
+        self.ball_x[index] = WIDTH / 2 - BALL_SIZE / 2
+        self.ball_y[index] = HEIGHT / 2 - BALL_SIZE / 2
+        self.ball_dx[index] = BALL_SPEED_X * self.rng.choice((-1, 1), len(index))
+        self.ball_dy[index] = BALL_SPEED_Y * self.rng.choice((-1, 1), len(index))
+
+    def reset(self):
+        self.paddle_y[:] = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        self.scores[:] = 0
+        self.serve(np.arange(self.games))
+        return self.observe()
+
+    def observe(self):
+        """Ball position and velocity plus both paddle tops, scaled to roughly [-1, 1]."""
+        obs = np.empty((self.games, OBSERVATION_SIZE), dtype=np.float32)
+        obs[:, 0] = self.ball_x / WIDTH
+        obs[:, 1] = self.ball_y / HEIGHT
+        obs[:, 2] = self.ball_dx / BALL_SPEED_X
+        obs[:, 3] = self.ball_dy / BALL_SPEED_Y
+        obs[:, 4:] = self.paddle_y / HEIGHT
+        return obs
+
+    def _time_to_hit(self, x, y, dx, dy, left, top, limit):
+        """Swept AABB test against one paddle per game; inf where there is no hit."""
+        right = left + PADDLE_WIDTH
+        bottom = top + PADDLE_HEIGHT
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_entry = np.where(dx > 0, (left - (x + BALL_SIZE)) / dx, (right - x) / dx)
+            x_exit = np.where(dx > 0, (right - x) / dx, (left - (x + BALL_SIZE)) / dx)
+            y_entry = np.where(dy > 0, (top - (y + BALL_SIZE)) / dy, (bottom - y) / dy)
+            y_exit = np.where(dy > 0, (bottom - y) / dy, (top - (y + BALL_SIZE)) / dy)
+        # A ball moving level either overlaps the paddle's rows the whole time or never
+        level = dy == 0
+        overlap = (top < y + BALL_SIZE) & (y < bottom)
+        y_entry[level] = np.where(overlap[level], -np.inf, np.inf)
+        y_exit[level] = np.where(overlap[level], np.inf, -np.inf)
+
+        entry = np.maximum(x_entry, y_entry)
+        exit = np.minimum(x_exit, y_exit)
+        hit = (entry < exit) & (entry <= limit) & (exit > 0)
+        return np.where(hit, np.maximum(entry, 0.0), np.inf)
+
+    def _move_balls(self):
+        x, y, dx, dy = self.ball_x, self.ball_y, self.ball_dx, self.ball_dy
+        remaining = np.ones(self.games)
+        active = np.arange(self.games)
+        for _ in range(MAX_BOUNCES):
+            ax, ay, adx, ady = x[active], y[active], dx[active], dy[active]
+            rest = remaining[active]
+
+            # Top and bottom walls
+            with np.errstate(divide='ignore', invalid='ignore'):
+                wall_time = np.where(ady < 0, -ay / ady, (HEIGHT - BALL_SIZE - ay) / ady)
+            wall_time = np.where(ady == 0, np.inf, np.maximum(wall_time, 0.0))
+
+            # Every paddle the ball is heading towards, in Ball.move's order and with its tie-breaking:
+            # a wall wins ties, and a later paddle has to be strictly earlier to take over
+            hit_time = np.minimum(rest, wall_time)
+            hit = np.where(wall_time < rest, WALL, NO_HIT)
+            tops = self.paddle_y[active]
+            for side in (0, 1):
+                heading = (PADDLE_X[side] + PADDLE_WIDTH // 2 - (ax + BALL_SIZE / 2)) * adx > 0
+                paddle_time = self._time_to_hit(ax, ay, adx, ady, PADDLE_X[side], tops[:, side], hit_time)
+                paddle_time[~heading] = np.inf
+                take = (paddle_time < hit_time) | ((hit == NO_HIT) & (paddle_time <= hit_time))
+                hit_time = np.where(take, paddle_time, hit_time)
+                hit = np.where(take, side, hit)
+
+            hit_paddle = hit >= 0
+            hit_wall = hit == WALL
+            x[active] = ax + adx * hit_time
+            y[active] = ay + ady * hit_time
+            remaining[active] = rest - hit_time
+
+            # Bounce off top and bottom walls
+            dy[active[hit_wall]] *= -1
+            # Speed up, reverse, and angle by where the ball meets the paddle
+            bounced = active[hit_paddle]
+            top = tops[hit_paddle, hit[hit_paddle]]
+            dx[bounced] *= -1.1
+            relative_y = (top + PADDLE_HEIGHT // 2 - (y[bounced] + BALL_SIZE / 2)) / (PADDLE_HEIGHT / 2)
+            dy[bounced] = -relative_y * BALL_SPEED_Y
+
+            active = active[hit_paddle | hit_wall]
+            if not len(active):
+                break
+
+    def step(self, actions):
+        """Advance every game one tick.
+
+        actions is an (N, 2) array of Pong INPUT_* bits for the left and right
+        paddles. Returns (observations, rewards, dones): rewards are +1 to the
+        side that scored and -1 to the other, dones mark matches that just
+        ended (and have been reset).
+        """
+        actions = np.asarray(actions)
+        # Up then down, each clamped to the court like Paddle.move, so both together can still move
+        up = (actions & INPUT_UP) != 0
+        down = (actions & INPUT_DOWN) != 0
+        np.clip(self.paddle_y - up * PADDLE_SPEED, 0, HEIGHT - PADDLE_HEIGHT, out=self.paddle_y)
+        np.clip(self.paddle_y + down * PADDLE_SPEED, 0, HEIGHT - PADDLE_HEIGHT, out=self.paddle_y)
+
+        self._move_balls()
+
+        # Scoring
+        rewards = np.zeros((self.games, 2), dtype=np.float32)
+        right_scores = self.ball_x <= 0
+        left_scores = ~right_scores & (self.ball_x + BALL_SIZE >= WIDTH)
+        rewards[right_scores] = (-1, 1)
+        rewards[left_scores] = (1, -1)
+        self.scores[right_scores, 1] += 1
+        self.scores[left_scores, 0] += 1
+        scored = np.flatnonzero(right_scores | left_scores)
+        if len(scored):
+            self.serve(scored)
+
+        dones = (self.scores >= WINNING_SCORE).any(axis=1)
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self.scores[finished] = 0
+            self.paddle_y[finished] = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        return self.observe(), rewards, dones
+
+def tracking_actions(obs, noise, rng):
+    """Both paddles chase the ball, each pressing a random key instead with probability noise."""
+    ball_centre = obs[:, 1:2] * HEIGHT + BALL_SIZE / 2
+    paddle_centre = obs[:, 4:] * HEIGHT + PADDLE_HEIGHT / 2
+    actions = np.where(ball_centre < paddle_centre - PADDLE_SPEED, INPUT_UP,
+                       np.where(ball_centre > paddle_centre + PADDLE_SPEED, INPUT_DOWN, 0))
+    random = rng.random(actions.shape) < noise
+    actions[random] = rng.choice((0, INPUT_UP, INPUT_DOWN), random.sum())
+    return actions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless vectorized Pong throughput benchmark")
+    parser.add_argument("--games", type=int, default=4096, help="matches stepped together")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--noise", type=float, default=0.5, help="chance a paddle moves at random")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    env = VecPong(args.games, args.seed)
+    rng = np.random.default_rng(args.seed)
+    obs = env.reset()
+    points = matches = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        obs, rewards, dones = env.step(tracking_actions(obs, args.noise, rng))
+        points += int((rewards[:, 0] != 0).sum())
+        matches += int(dones.sum())
+    elapsed = time.perf_counter() - start
+    ticks = args.games * args.steps
+    print(f"{ticks:,} game ticks in {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/s), "
+          f"{points:,} points, {matches:,} matches finished")
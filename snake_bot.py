@@ -0,0 +1,216 @@
+import argparse
+import random
+import time
+from collections import deque
+
+from Snake import ATE, DIED, GRID_HEIGHT, GRID_WIDTH, WON, Food, Snake
+
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+RETRY_INTERVAL = 8  # Ticks to follow the cycle before searching for a shortcut again
+SLACK = 2  # Free cells kept between the head and the tail after any growth still to come
+
+def hamiltonian_cycle(width, height):
+    """Successor of every cell on a cycle through the whole board, or None if there is none.
+
+    With an even number of rows (or, transposed, columns) it serpentines
+    through columns 1.. row by row and returns up column 0. When both are
+    odd it serpentines through all rows but the last two, zigzags back
+    along those, and closes by wrapping from the bottom edge to the top
+    as Snake.step does.
+    """
+    if width < 2 or height < 2:
+        return None
+    transpose = height % 2 and not width % 2
+    if transpose:
+        width, height = height, width
+
+    if height % 2 == 0:
+        order = [(0, 0)]
+        for y in range(height):
+            xs = range(1, width) if y % 2 == 0 else range(width - 1, 0, -1)
+            order += [(x, y) for x in xs]
+        order += [(0, y) for y in range(height - 1, 0, -1)]
+    else:
+        order = []
+        for y in range(height - 2):
+            xs = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+            order += [(x, y) for x in xs]
+        for x in range(width - 1, -1, -1):
+            ys = (height - 2, height - 1) if (width - 1 - x) % 2 == 0 else (height - 1, height - 2)
+            order += [(x, y) for y in ys]
+    if transpose:
+        order = [(y, x) for x, y in order]
+        width, height = height, width
+
+    successor = [0] * (width * height)
+    for (x, y), (next_x, next_y) in zip(order, order[1:] + order[:1]):
+        successor[y * width + x] = next_y * width + next_x
+    return successor
+
+class Autopilot:
+    """Steers a Snake around a Hamiltonian cycle, taking BFS shortcuts to the food.
+
+    The body is always laid out in cycle order from tail to head, so the
+    cells ahead of the head on the cycle are free up to the tail and
+    following the cycle can't run into it. A shortcut is a shortest path
+    on the occupancy grid that only steps forward along the cycle and
+    stops short of the tail with room for the growth still to come. It is
+    cached until the food moves or the body blocks it; without one the
+    snake follows the cycle for a few ticks before searching again.
+    """
+
+    def __init__(self, snake):
+        self.snake = snake
+        width, height = snake.width, snake.height
+        self.cells = width * height
+        # Neighbouring cell index for each direction, wrapping like Snake.step
+        self.neighbours = [[((i % width + dx) % width) + ((i // width + dy) % height) * width
+                            for dx, dy in DIRECTIONS] for i in range(self.cells)]
+        self.cycle = hamiltonian_cycle(width, height)
+        if self.cycle is None:
+            raise ValueError(f"No Hamiltonian cycle on a {width}x{height} board")
+        # Cells in cycle order, the position of every cell along it, and which way round to go
+        self.order = []
+        self.rank = [0] * self.cells
+        cell = 0
+        for i in range(self.cells):
+            self.order.append(cell)
+            self.rank[cell] = i
+            cell = self.cycle[cell]
+        self.way = 1
+        self.path = deque()
+        self.path_food = None
+        self.retry_tick = 0
+        self.tick = 0
+        self.searches = 0
+        self.cached_moves = 0
+        self.fallback_moves = 0
+
+    def reset(self):
+        self.path.clear()
+        self.path_food = None
+        self.retry_tick = 0
+
+    def ahead(self, start, cell):
+        """How many steps along the cycle (the way the snake goes round) cell is from start."""
+        return (self.rank[cell] - self.rank[start]) * self.way % self.cells
+
+    def shortcut(self, head, food_cell, moves):
+        """BFS path of cell indices to the food that keeps the body in cycle order, or None."""
+        snake = self.snake
+        length = len(snake.positions)
+        # Steps along the cycle to the tail, and the free cells the body skipped over behind the head
+        gap = self.ahead(head, snake.cell_index(snake.positions[-1])) if length > 1 else self.cells
+        holes = self.cells - gap + 1 - length
+        pending = snake.grow_to - length
+        # Room to keep between the head and the tail once this food is eaten: the growth still
+        # to come, the skipped cells (free until the tail passes them), and a run as long as
+        # the snake for food eaten on the way round before the tail gets past them
+        limit = gap - pending - 1 - SLACK - holes - (snake.grow_to + 1)
+        food_distance = self.ahead(head, food_cell)
+        if not 0 < food_distance <= limit:
+            return None
+
+        # Everything less than gap cells ahead is free, so only the cycle order needs checking
+        parent = {head: head}
+        queue = deque([head])
+        while queue:
+            cell = queue.popleft()
+            distance = self.ahead(head, cell)
+            for neighbour in moves if cell == head else self.neighbours[cell]:
+                if neighbour in parent or not distance < self.ahead(head, neighbour) <= food_distance:
+                    continue
+                parent[neighbour] = cell
+                if neighbour == food_cell:
+                    path = deque()
+                    while neighbour != head:
+                        path.appendleft(neighbour)
+                        neighbour = parent[neighbour]
+                    # The cells the path skips join the holes until the tail passes them
+                    if food_distance - len(path) > limit - food_distance:
+                        return None
+                    return path
+                queue.append(neighbour)
+        return None
+
+    def head_moves(self):
+        """Neighbours of the head, without the 180-degree turn Snake refuses."""
+        snake = self.snake
+        head = snake.cell_index(snake.get_head_position())
+        back = DIRECTIONS.index((-snake.direction[0], -snake.direction[1]))
+        return head, [cell for i, cell in enumerate(self.neighbours[head]) if i != back]
+
+    def direction_to(self, head, cell):
+        return DIRECTIONS[self.neighbours[head].index(cell)]
+
+    def choose_direction(self, food):
+        """Direction for the next move towards food (a grid position)."""
+        snake = self.snake
+        occupied = snake.occupied
+        food_cell = snake.cell_index(food)
+        head, moves = self.head_moves()
+        self.tick += 1
+        if len(snake.positions) == 1:
+            # A new snake may be facing against the cycle; then it goes round the other way
+            self.way = 1 if self.order[(self.rank[head] + 1) % self.cells] in moves else -1
+
+        # Keep the cached path while it still starts next to the head and the body doesn't block it
+        if self.path and self.path_food == food_cell and self.path[0] in moves and not occupied[self.path[0]]:
+            self.cached_moves += 1
+            return self.direction_to(head, self.path.popleft())
+
+        self.path.clear()
+        if self.tick >= self.retry_tick:
+            self.searches += 1
+            path = self.shortcut(head, food_cell, moves)
+            if path is not None:
+                self.path, self.path_food = path, food_cell
+                return self.direction_to(head, self.path.popleft())
+            self.retry_tick = self.tick + RETRY_INTERVAL
+
+        # No shortcut: follow the cycle (the nearest free cell ahead, in case it is boxed in)
+        self.fallback_moves += 1
+        free = [cell for cell in moves if not occupied[cell]]
+        if not free:
+            return snake.direction  # Boxed in
+        return self.direction_to(head, min(free, key=lambda cell: self.ahead(head, cell)))
+
+def soak(ticks, width=GRID_WIDTH, height=GRID_HEIGHT, seed=None):
+    """Let the autopilot play back-to-back games without a display and report throughput."""
+    random.seed(seed)
+    snake = Snake(width, height)
+    food = Food(snake)
+    bot = Autopilot(snake)
+    games = wins = deaths = eaten = 0
+    lengths = []
+    start = time.perf_counter()
+    for _ in range(ticks):
+        snake.change_direction(bot.choose_direction(food.position))
+        outcome = snake.advance(food)
+        if outcome in (ATE, WON):
+            eaten += 1
+        if outcome in (DIED, WON):
+            games += 1
+            deaths += outcome == DIED
+            wins += outcome == WON
+            lengths.append(len(snake.positions))
+            snake.reset()
+            food.randomize_position(snake)
+            bot.reset()
+    elapsed = time.perf_counter() - start
+
+    print(f"{ticks:,} ticks in {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/s) on a {width}x{height} board")
+    print(f"{games} games finished: {wins} wins, {deaths} deaths; {eaten} food eaten; "
+          f"current length {len(snake.positions)}")
+    if lengths:
+        print(f"Final length avg {sum(lengths) / len(lengths):.0f}, max {max(lengths)} of {width * height} cells")
+    print(f"{bot.searches} path searches, {bot.cached_moves} cached moves, {bot.fallback_moves} fallback moves")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Snake autopilot soak test")
+    parser.add_argument("--ticks", type=int, default=100_000)
+    parser.add_argument("--width", type=int, default=GRID_WIDTH)
+    parser.add_argument("--height", type=int, default=GRID_HEIGHT)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    soak(args.ticks, args.width, args.height, args.seed)
@@ -0,0 +1,159 @@
+import argparse
+import time
+
+import numpy as np
+
+from Snake import GRID_HEIGHT, GRID_WIDTH, INITIAL_LENGTH
+
+# Same order as snake_bot.DIRECTIONS: up, down, left, right
+DIRECTIONS = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)])
+OPPOSITE = np.array([1, 0, 3, 2])
+# Cell codes in observations
+EMPTY, BODY, HEAD, FOOD = 0, 1, 2, 3
+
+class VecSnake:
+    """N independent Snake boards stepped together.
+
+    Each board has an occupancy count grid (flattened) and a ring buffer of
+    body cells from tail to head. Movement wraps around the edges, the tail
+    still blocks the head on the move it leaves, and eating grows the snake
+    by one, as in Snake.step and Snake.grow. Boards that die or fill up are
+    started over on the same step.
+    """
+
+    def __init__(self, boards, width=GRID_WIDTH, height=GRID_HEIGHT, seed=None):
+        self.boards = boards
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(boards)
+        self.occupied = np.zeros((boards, self.cells), dtype=np.int8)
+        self.body = np.zeros((boards, self.cells), dtype=np.int32)  # Ring buffer of cell indices
+        self.head = np.zeros(boards, dtype=np.int64)    # Ring slot of the head
+        self.length = np.zeros(boards, dtype=np.int64)
+        self.grow_to = np.zeros(boards, dtype=np.int64)
+        self.direction = np.zeros(boards, dtype=np.int64)
+        self.food = np.zeros(boards, dtype=np.int64)
+        self.score = np.zeros(boards, dtype=np.int64)
+        self.reset_boards(self.rows)
+
+    def reset_boards(self, index):
+        """Start the given boards over: a one-cell snake in the middle heading a random way."""
+        start = (self.height // 2) * self.width + self.width // 2
+        self.occupied[index] = 0
+        self.occupied[index, start] = 1
+        self.body[index, 0] = start
+        self.head[index] = 0
+        self.length[index] = 1
+        self.grow_to[index] = INITIAL_LENGTH
+        self.direction[index] = self.rng.integers(0, 4, len(index))
+        self.score[index] = 0
+        self.place_food(index)
+
+    def reset(self):
+        self.reset_boards(self.rows)
+        return self.observe()
+
+    def place_food(self, index):
+        """Put food on a uniformly random free cell of each board; returns which boards are full."""
+        keys = self.rng.random((len(index), self.cells))
+        keys[self.occupied[index] > 0] = -1.0
+        cells = keys.argmax(axis=1)
+        self.food[index] = cells
+        return keys[np.arange(len(index)), cells] < 0
+
+    def observe(self):
+        """(N, height, width) int8 boards of EMPTY, BODY, HEAD and FOOD."""
+        obs = (self.occupied > 0).astype(np.int8)
+        obs[self.rows, self.body[self.rows, self.head]] = HEAD
+        obs[self.rows, self.food] = FOOD
+        return obs.reshape(self.boards, self.height, self.width)
+
+    def positions(self, board):
+        """Body of one board as (x, y) from head to tail, like Snake.positions."""
+        slots = (self.head[board] - np.arange(self.length[board])) % self.cells
+        return [(int(cell) % self.width, int(cell) // self.width) for cell in self.body[board, slots]]
+
+    def step(self, actions):
+        """Advance every board one move.
+
+        actions holds a direction index per board (see DIRECTIONS); a
+        180-degree turn is ignored like Snake.change_direction does.
+        Returns (observations, rewards, dones): +1 for eating, -1 for
+        running into itself; dones mark boards that died or filled the grid.
+        """
+        actions = np.asarray(actions)
+        turn = actions != OPPOSITE[self.direction]
+        self.direction[turn] = actions[turn]
+
+        # New head, wrapping around the edges
+        head_cell = self.body[self.rows, self.head]
+        dx, dy = DIRECTIONS[self.direction].T
+        new_cell = ((head_cell // self.width + dy) % self.height) * self.width + (head_cell % self.width + dx) % self.width
+
+        # Check for collision with self (the tail still counts, it moves after the head)
+        dead = self.occupied[self.rows, new_cell] > 0
+        alive = self.rows[~dead]
+        new_cell = new_cell[alive]
+        self.head[alive] = (self.head[alive] + 1) % self.cells
+        self.body[alive, self.head[alive]] = new_cell
+        self.occupied[alive, new_cell] += 1
+        self.length[alive] += 1
+
+        # Drop the tail unless the snake is still growing
+        shrink = alive[self.length[alive] > self.grow_to[alive]]
+        tail = self.body[shrink, (self.head[shrink] - self.length[shrink] + 1) % self.cells]
+        self.occupied[shrink, tail] -= 1
+        self.length[shrink] -= 1
+
+        # Food
+        rewards = np.zeros(self.boards, dtype=np.float32)
+        rewards[dead] = -1.0
+        eaten = alive[new_cell == self.food[alive]]
+        self.grow_to[eaten] += 1
+        self.score[eaten] += 10
+        rewards[eaten] = 1.0
+        dones = dead.copy()
+        if len(eaten):
+            # No free cell left for the food means the board is full, a win as in Snake.advance
+            dones[eaten[self.place_food(eaten)]] = True
+
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self.reset_boards(finished)
+        return self.observe(), rewards, dones
+
+def random_safe_actions(env, rng):
+    """Random direction per board, avoiding an occupied cell when there is a free one."""
+    head_cell = env.body[env.rows, env.head]
+    x = head_cell % env.width
+    y = head_cell // env.width
+    keys = rng.random((env.boards, 4))
+    for d, (dx, dy) in enumerate(DIRECTIONS):
+        cell = ((y + dy) % env.height) * env.width + (x + dx) % env.width
+        keys[env.occupied[env.rows, cell] > 0, d] -= 1.0
+    keys[env.rows, OPPOSITE[env.direction]] = -2.0
+    return keys.argmax(axis=1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless vectorized Snake throughput benchmark")
+    parser.add_argument("--boards", type=int, default=4096, help="boards stepped together")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--width", type=int, default=GRID_WIDTH)
+    parser.add_argument("--height", type=int, default=GRID_HEIGHT)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    env = VecSnake(args.boards, args.width, args.height, args.seed)
+    rng = np.random.default_rng(args.seed)
+    food = deaths = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        _, rewards, dones = env.step(random_safe_actions(env, rng))
+        food += int((rewards > 0).sum())
+        deaths += int((rewards < 0).sum())
+    elapsed = time.perf_counter() - start
+    steps = args.boards * args.steps
+    print(f"{steps:,} board steps in {elapsed:.2f}s ({steps / elapsed * 60:,.0f} steps/min), "
+          f"{food:,} food eaten, {deaths:,} deaths")
@@ -1,81 +1,440 @@
+import argparse
+import hashlib
+import os
+from collections import OrderedDict
+
+# Perfect-play table: one byte per base-3 encoded board (3^9 entries).
+# High nibble holds the score for the side to move (0 loss, 1 draw, 2 win),
+# low nibble the best cell (0-8, or NO_MOVE on finished boards).
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tictac_1_table.bin")
+TABLE_SIZE = 3 ** 9
+REACHABLE_POSITIONS = 5478
+# SHA-256 of the table build_table produces; a saved file must match it byte for byte
+TABLE_SHA256 = '653cb64ef7bb79f3683ffb1f5d1ed599a0310b913df6a7238581f20a0ce9f477'
+NO_MOVE = 9
+UNREACHABLE = 0xFF
+
+# Directions walked from the last stone: horizontal, vertical and both diagonals
+LINE_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+def new_board(rows=3, cols=3):
+    """Create an empty rows x cols board."""
+    return [[' ' for _ in range(cols)] for _ in range(rows)]
+
 def print_board(board):
     """Display the Tic Tac Toe board."""
+    width = max(len(cell) for row in board for cell in row)
     print("\n")
-    for i in range(3):
-        print(f" {board[i][0]} | {board[i][1]} | {board[i][2]} ")
-        if i < 2:
-            print("-----------")
+    for i, row in enumerate(board):
+        print(" " + " | ".join(cell.rjust(width) for cell in row) + " ")
+        if i < len(board) - 1:
+            print("-" * (len(row) * (width + 3) - 1))
     print("\n")
 
-def check_win(board, player):
-    """Check if the player has won."""
-    # Check rows and columns
-    for i in range(3):
-        if all(board[i][j] == player for j in range(3)):  # Rows
-            return True
-        if all(board[j][i] == player for j in range(3)):  # Columns
-            return True
-    
-    # Check diagonals
-    if all(board[i][i] == player for i in range(3)):  # Main diagonal
-        return True
-    if all(board[i][2-i] == player for i in range(3)):  # Anti-diagonal
-        return True
-    
-    return False
+# Bitboards: one 9-bit integer per player, bit (row * 3 + col) set for each mark
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # Rows
+    0b001001001, 0b010010010, 0b100100100,  # Columns
+    0b100010001, 0b001010100,               # Diagonals
+)
+
+# Every mask test precomputed for all 512 possible bitboards
+WINNING_BITS = tuple(any(bits & mask == mask for mask in WIN_MASKS) for bits in range(1 << 9))
+
+class BitBoard:
+    """Tic Tac Toe state stored as one bitboard per player plus a move counter."""
+    __slots__ = ('bits', 'moves')
+
+    def __init__(self, x_bits=0, o_bits=0):
+        self.bits = {'X': x_bits, 'O': o_bits}
+        self.moves = (x_bits | o_bits).bit_count()
+
+    @classmethod
+    def from_board(cls, board):
+        return cls(board_to_bits(board, 'X'), board_to_bits(board, 'O'))
+
+    def occupied(self):
+        return self.bits['X'] | self.bits['O']
+
+    def is_empty(self, cell):
+        return not self.occupied() >> cell & 1
+
+    def play(self, cell, player):
+        self.bits[player] |= 1 << cell
+        self.moves += 1
+
+    def undo(self, cell, player):
+        self.bits[player] &= ~(1 << cell)
+        self.moves -= 1
+
+    def wins(self, player):
+        return WINNING_BITS[self.bits[player]]
+
+    def is_full(self):
+        return self.moves == 9
+
+    def key(self):
+        """The board_key of this position."""
+        return BITS_TO_KEY[self.bits['X']] + 2 * BITS_TO_KEY[self.bits['O']]
+
+    def canonical_key(self):
+        """(key, symmetry) for the smallest key among the position's 8 symmetries."""
+        x_bits, o_bits = self.bits['X'], self.bits['O']
+        return min((BITS_TO_KEY[table[x_bits]] + 2 * BITS_TO_KEY[table[o_bits]], symmetry)
+                   for symmetry, table in enumerate(SYMMETRIC_BITS))
+
+def board_to_bits(board, player):
+    """Pack the player's marks on a list-of-lists board into a bitboard."""
+    bits = 0
+    bit = 1
+    for row in board:
+        for cell in row:
+            if cell == player:
+                bits |= bit
+            bit <<= 1
+    return bits
+
+def check_win(board, player, k=3):
+    """Check if the player has k in a row anywhere on the board."""
+    if len(board) == 3 and len(board[0]) == 3 and k == 3:
+        return WINNING_BITS[board_to_bits(board, player)]
+    # Other shapes don't fit a 9-bit board; look for a line through each of the player's stones
+    return any(cell == player and check_win_at(board, row, col, k)
+               for row, cells in enumerate(board) for col, cell in enumerate(cells))
 
 def is_board_full(board):
     """Check if the board is full (tie)."""
-    return all(board[i][j] != ' ' for i in range(3) for j in range(3))
+    # Membership tests run in C; BitBoard.is_full uses its move counter instead
+    return not any(' ' in row for row in board)
+
+def winning_line_at(board, row, col, k=3):
+    """Return the end cells of a k-in-a-row through (row, col), or None."""
+    player = board[row][col]
+    rows, cols = len(board), len(board[0])
+    for dr, dc in LINE_DIRECTIONS:
+        # Walk both ways along the line, never further than k - 1 cells
+        count = 1
+        r, c = row + dr, col + dc
+        while count < k and 0 <= r < rows and 0 <= c < cols and board[r][c] == player:
+            count += 1
+            r += dr
+            c += dc
+        end_row, end_col = r - dr, c - dc
+        r, c = row - dr, col - dc
+        while count < k and 0 <= r < rows and 0 <= c < cols and board[r][c] == player:
+            count += 1
+            r -= dr
+            c -= dc
+        if count >= k:
+            return (r + dr, c + dc), (end_row, end_col)
+    return None
+
+def check_win_at(board, row, col, k=3):
+    """Check if the stone just placed at (row, col) completes k in a row."""
+    return winning_line_at(board, row, col, k) is not None
+
+def parse_move(board, text):
+    """Turn a 1-based move number into (row, col), raising ValueError if it can't be played."""
+    cols = len(board[0])
+    size = len(board) * cols
+    try:
+        move = int(text)
+    except ValueError:
+        raise ValueError("Invalid input. Please enter a number.") from None
+    if not 1 <= move <= size:
+        raise ValueError(f"Please enter a number between 1 and {size}.")
+    row = (move - 1) // cols
+    col = (move - 1) % cols
+    if board[row][col] != ' ':
+        raise ValueError("That position is already taken!")
+    return row, col
 
 def get_valid_move(board):
     """Get and validate player move."""
+    size = len(board) * len(board[0])
     while True:
         try:
-            move = int(input("Enter your move (1-9): "))
-            if 1 <= move <= 9:
-                row = (move - 1) // 3
-                col = (move - 1) % 3
-                if board[row][col] == ' ':
-                    return row, col
-                else:
-                    print("That position is already taken!")
-            else:
-                print("Please enter a number between 1 and 9.")
-        except ValueError:
-            print("Invalid input. Please enter a number.")
-
-def main():
+            return parse_move(board, input(f"Enter your move (1-{size}): "))
+        except ValueError as e:
+            print(e)
+
+def board_key(board):
+    """Encode the board as a base-3 integer (empty = 0, X = 1, O = 2)."""
+    key = 0
+    for row in board:
+        for cell in row:
+            key = key * 3 + (1 if cell == 'X' else 2 if cell == 'O' else 0)
+    return key
+
+def key_to_board(key):
+    """Decode a base-3 board key back into a list-of-lists board."""
+    cells = []
+    for _ in range(9):
+        key, digit = divmod(key, 3)
+        cells.append(' XO'[digit])
+    cells.reverse()
+    return [cells[0:3], cells[3:6], cells[6:9]]
+
+# The 8 rotations and reflections of the board as cell permutations:
+# cell i of the transformed board is cell SYMMETRIES[s][i] of the original
+SYMMETRIES = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # Identity
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # Rotate 90
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # Rotate 180
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # Rotate 270
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # Mirror left-right
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # Mirror top-bottom
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # Main diagonal
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),  # Anti-diagonal
+)
+
+def _permute_bits(bits, perm):
+    return sum(1 << i for i, source in enumerate(perm) if bits >> source & 1)
+
+# Bitboard -> base-3 digits (as in board_key), and every symmetry of every bitboard
+BITS_TO_KEY = tuple(sum(3 ** (8 - i) for i in range(9) if bits >> i & 1) for bits in range(1 << 9))
+SYMMETRIC_BITS = tuple(tuple(_permute_bits(bits, perm) for bits in range(1 << 9)) for perm in SYMMETRIES)
+
+def canonical_key(board):
+    """Return (key, symmetry) for the smallest board_key among the board's 8 symmetries.
+
+    Works on tictac_1 (' ') and tictac_2 (None) boards alike. Cell i of the
+    canonical board is cell SYMMETRIES[symmetry][i] of the original.
+    """
+    x_bits = board_to_bits(board, 'X')
+    o_bits = board_to_bits(board, 'O')
+    return min((BITS_TO_KEY[table[x_bits]] + 2 * BITS_TO_KEY[table[o_bits]], symmetry)
+               for symmetry, table in enumerate(SYMMETRIC_BITS))
+
+class TranspositionCache:
+    """Bounded LRU cache of search results keyed by the canonical position of a BitBoard.
+
+    Rotated and reflected copies of a position share one entry. Values
+    must be symmetry-invariant (scores); store moves in canonical cells.
+    """
+
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, state, default=None):
+        key = state.canonical_key()[0]
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, state, value):
+        key = state.canonical_key()[0]
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return (f"{len(self.entries)} entries, {self.hits} hits, {self.misses} misses, "
+                f"{self.hit_rate:.1%} hit rate")
+
+def negamax(state, player, cache):
+    """Score the BitBoard for player to move (1 win, 0 draw, -1 loss) through the cache."""
+    score = cache.get(state)
+    if score is not None:
+        return score
+
+    opponent = 'O' if player == 'X' else 'X'
+    if state.wins(opponent):
+        score = -1
+    elif state.is_full():
+        score = 0
+    else:
+        score = -1
+        for cell in range(9):
+            if state.is_empty(cell):
+                state.play(cell, player)
+                score = max(score, -negamax(state, opponent, cache))
+                state.undo(cell, player)
+                if score == 1:
+                    break
+
+    cache.put(state, score)
+    return score
+
+def _solve(state, player, table):
+    """Negamax over every position reachable from the BitBoard, filling in the table."""
+    key = state.key()
+    if table[key] != UNREACHABLE:
+        return (table[key] >> 4) - 1
+
+    opponent = 'O' if player == 'X' else 'X'
+    if state.wins(opponent):
+        score, best = -1, NO_MOVE
+    elif state.is_full():
+        score, best = 0, NO_MOVE
+    else:
+        score, best = -2, NO_MOVE
+        for cell in range(9):
+            if state.is_empty(cell):
+                state.play(cell, player)
+                value = -_solve(state, opponent, table)
+                state.undo(cell, player)
+                if value > score:
+                    score, best = value, cell
+
+    table[key] = (score + 1) << 4 | best
+    return score
+
+def build_table():
+    """Solve every position reachable from the empty board."""
+    table = bytearray([UNREACHABLE]) * TABLE_SIZE
+    _solve(BitBoard(), 'X', table)
+    return bytes(table)
+
+def verify_table(table):
+    """Check the table size, position count, finished boards and scores.
+
+    Scores are re-derived with a symmetry-aware negamax; returns its cache.
+    """
+    if len(table) != TABLE_SIZE:
+        raise ValueError(f"Table has {len(table)} entries, expected {TABLE_SIZE}")
+
+    cache = TranspositionCache()
+    positions = 0
+    for key, entry in enumerate(table):
+        if entry == UNREACHABLE:
+            continue
+        positions += 1
+        state = BitBoard.from_board(key_to_board(key))
+        finished = state.wins('X') or state.wins('O') or state.is_full()
+        if finished != (entry & 0x0F == NO_MOVE):
+            raise ValueError(f"Table entry for position {key} disagrees with check_win/is_board_full")
+        player = 'X' if state.moves % 2 == 0 else 'O'
+        if (entry >> 4) - 1 != negamax(state, player, cache):
+            raise ValueError(f"Table score for position {key} disagrees with negamax")
+
+    if positions != REACHABLE_POSITIONS:
+        raise ValueError(f"Table has {positions} positions, expected {REACHABLE_POSITIONS}")
+    return cache
+
+def load_table(path=TABLE_PATH):
+    """Load the perfect-play table, building and saving it on first use.
+
+    A saved file that fails the checksum is rebuilt; if it cannot be written
+    back, the freshly built table is still returned.
+    """
+    if os.path.exists(path) and os.path.getsize(path) == TABLE_SIZE:
+        with open(path, 'rb') as f:
+            table = f.read()
+        if hashlib.sha256(table).hexdigest() == TABLE_SHA256:
+            return table
+
+    table = bytes(build_table())
+    verify_table(table)
+    try:
+        with open(path, 'wb') as f:
+            f.write(table)
+    except OSError as e:
+        print(f"Could not save {path}: {e}")
+    return table
+
+def computer_move(board, table):
+    """Look up the perfect-play move for the side to move."""
+    entry = table[board_key(board)]
+    if entry == UNREACHABLE or entry & 0x0F == NO_MOVE:
+        raise ValueError("No move available for this position")
+    return divmod(entry & 0x0F, 3)
+
+def main(computer=None, rows=3, cols=3, k=3, engine='table', budget_ms=1000):
     """Main game function."""
     # Initialize game
-    board = [[' ' for _ in range(3)] for _ in range(3)]
+    board = new_board(rows, cols)
     current_player = 'X'
     move_count = 0
+    table = load_table() if computer and engine == 'table' else None
+    ai = None
+    if computer and engine == 'mcts':
+        from tictac_mcts import MCTSPlayer
+        ai = MCTSPlayer(k=k, time_budget_ms=budget_ms)
     
     print("Welcome to Tic Tac Toe!")
-    print("Use numbers 1-9 to make your move as shown below:")
-    print_board([['1', '2', '3'], ['4', '5', '6'], ['7', '8', '9']])
+    if (rows, cols, k) != (3, 3, 3):
+        print(f"{rows}x{cols} board, {k} in a row wins.")
+    print(f"Use numbers 1-{rows * cols} to make your move as shown below:")
+    print_board([[str(row * cols + col + 1) for col in range(cols)] for row in range(rows)])
     
     # Game loop
     while True:
         print(f"Player {current_player}'s turn")
-        row, col = get_valid_move(board)
+        if current_player == computer and ai:
+            row, col = ai.choose_move(board, current_player)
+            print(f"Computer plays {row * cols + col + 1} "
+                  f"({ai.last_playouts} playouts, {ai.playouts_per_second:,.0f}/s)")
+        elif current_player == computer:
+            row, col = computer_move(board, table)
+            print(f"Computer plays {row * cols + col + 1}")
+        else:
+            row, col = get_valid_move(board)
         board[row][col] = current_player
         move_count += 1
         print_board(board)
         
-        # Check win
-        if check_win(board, current_player):
+        # Check win (only the lines through the new stone can have changed)
+        if check_win_at(board, row, col, k):
             print(f"Player {current_player} wins!")
             break
         
         # Check tie
-        if move_count == 9:
+        if move_count == rows * cols:
             print("It's a tie!")
             break
         
         # Switch player
         current_player = 'O' if current_player == 'X' else 'X'
 
+    if ai:
+        ai.close()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Console Tic Tac Toe")
+    parser.add_argument("--computer", choices=['X', 'O'],
+                        help="let the computer play this side")
+    parser.add_argument("--engine", choices=['table', 'mcts'], default='table',
+                        help="perfect-play table (3x3 only) or Monte Carlo tree search")
+    parser.add_argument("--budget", type=int, default=1000,
+                        help="MCTS thinking time per move in milliseconds")
+    parser.add_argument("--simulate", type=int, metavar="GAMES",
+                        help="play GAMES non-interactive 3x3 games and print outcome statistics")
+    parser.add_argument("--x-policy", choices=['random', 'perfect'], default='random',
+                        help="how X moves in --simulate")
+    parser.add_argument("--o-policy", choices=['random', 'perfect'], default='random',
+                        help="how O moves in --simulate")
+    parser.add_argument("--epsilon", type=float, default=0.0,
+                        help="chance a perfect player makes a random move in --simulate")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for --simulate")
+    parser.add_argument("--rows", type=int, default=3, help="board height")
+    parser.add_argument("--cols", type=int, default=3, help="board width")
+    parser.add_argument("--k", type=int, default=3, help="stones in a row needed to win")
+    args = parser.parse_args()
+    if args.simulate is not None:
+        if args.simulate < 1:
+            parser.error("--simulate needs at least one game")
+        from tictac_batch import print_report, simulate
+        print_report(simulate(args.simulate, args.x_policy, args.o_policy, args.epsilon, args.seed))
+        raise SystemExit
+    if args.rows < 1 or args.cols < 1 or not 1 <= args.k <= max(args.rows, args.cols):
+        parser.error("need rows, cols >= 1 and 1 <= k <= max(rows, cols)")
+    if args.computer and args.engine == 'table' and (args.rows, args.cols, args.k) != (3, 3, 3):
+        parser.error("the table engine only covers the standard 3x3 board; use --engine mcts")
+    main(computer=args.computer, rows=args.rows, cols=args.cols, k=args.k,
+         engine=args.engine, budget_ms=args.budget)
@@ -1,8 +1,14 @@
 import pygame
 import sys
+import argparse
+import queue
+import random
+import threading
+import time
+import traceback
 
-# Initialize pygame
-pygame.init()
+from tictac_1 import winning_line_at
+from tictac_mcts import MCTSPlayer
 
 # Constants
 WIDTH, HEIGHT = 600, 700
@@ -11,8 +17,11 @@ GRID_SIZE = BOARD_SIZE // 3
 LINE_WIDTH = 15
 CIRCLE_WIDTH = 15
 CROSS_WIDTH = 20
-CIRCLE_RADIUS = GRID_SIZE // 3
-SPACE = GRID_SIZE // 4
+
+# Viewport zoom limits (cell size in pixels) and zoom step per wheel click
+MIN_CELL_SIZE = 16
+MAX_CELL_SIZE = GRID_SIZE
+ZOOM_STEP = 1.25
 
 # Colors
 BG_COLOR = (28, 170, 156)
@@ -23,186 +32,515 @@ TEXT_COLOR = (255, 255, 255)
 BUTTON_COLOR = (70, 130, 180)
 BUTTON_HOVER_COLOR = (100, 149, 237)
 
-# Set up the display
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption('Tic Tac Toe')
-screen.fill(BG_COLOR)
-
-# Game variables
-board = [[None for _ in range(3)] for _ in range(3)]
-player = 'X'
-game_over = False
-winner = None
-
-# Fonts
-font = pygame.font.SysFont('Arial', 40)
-small_font = pygame.font.SysFont('Arial', 30)
-
-def draw_lines():
-    # Horizontal lines
-    pygame.draw.line(screen, LINE_COLOR, (75, 75 + GRID_SIZE), (75 + BOARD_SIZE, 75 + GRID_SIZE), LINE_WIDTH)
-    pygame.draw.line(screen, LINE_COLOR, (75, 75 + 2 * GRID_SIZE), (75 + BOARD_SIZE, 75 + 2 * GRID_SIZE), LINE_WIDTH)
-    
-    # Vertical lines
-    pygame.draw.line(screen, LINE_COLOR, (75 + GRID_SIZE, 75), (75 + GRID_SIZE, 75 + BOARD_SIZE), LINE_WIDTH)
-    pygame.draw.line(screen, LINE_COLOR, (75 + 2 * GRID_SIZE, 75), (75 + 2 * GRID_SIZE, 75 + BOARD_SIZE), LINE_WIDTH)
-
-def draw_figures():
-    for row in range(3):
-        for col in range(3):
-            if board[row][col] == 'O':
-                pygame.draw.circle(screen, CIRCLE_COLOR, 
-                                  (col * GRID_SIZE + 75 + GRID_SIZE // 2, row * GRID_SIZE + 75 + GRID_SIZE // 2), 
-                                  CIRCLE_RADIUS, CIRCLE_WIDTH)
-            elif board[row][col] == 'X':
-                # Draw X
-                pygame.draw.line(screen, CROSS_COLOR, 
-                                (col * GRID_SIZE + 75 + SPACE, row * GRID_SIZE + 75 + SPACE),
-                                (col * GRID_SIZE + 75 + GRID_SIZE - SPACE, row * GRID_SIZE + 75 + GRID_SIZE - SPACE), 
-                                CROSS_WIDTH)
-                pygame.draw.line(screen, CROSS_COLOR, 
-                                (col * GRID_SIZE + 75 + SPACE, row * GRID_SIZE + 75 + GRID_SIZE - SPACE),
-                                (col * GRID_SIZE + 75 + GRID_SIZE - SPACE, row * GRID_SIZE + 75 + SPACE), 
-                                CROSS_WIDTH)
-
-def mark_square(row, col, player):
-    board[row][col] = player
-
-def available_square(row, col):
-    return board[row][col] is None
-
-def is_board_full():
-    for row in range(3):
-        for col in range(3):
-            if board[row][col] is None:
-                return False
-    return True
-
-def check_win(player):
-    # Vertical win check
-    for col in range(3):
-        if board[0][col] == player and board[1][col] == player and board[2][col] == player:
-            draw_vertical_winning_line(col, player)
-            return True
-
-    # Horizontal win check
-    for row in range(3):
-        if board[row][0] == player and board[row][1] == player and board[row][2] == player:
-            draw_horizontal_winning_line(row, player)
-            return True
-
-    # Ascending diagonal win check
-    if board[2][0] == player and board[1][1] == player and board[0][2] == player:
-        draw_asc_diagonal(player)
+# Screen regions repainted independently; BOARD_RECT is the viewport onto the board
+BOARD_RECT = pygame.Rect(75, 75, BOARD_SIZE, BOARD_SIZE)
+STATUS_RECT = pygame.Rect(0, 0, WIDTH, 70)
+BUTTON_RECT = pygame.Rect(WIDTH // 2 - 75, HEIGHT - 70, 150, 50)
+
+# Posted by the computer opponent's worker thread when its move is ready
+AI_MOVE_EVENT = pygame.USEREVENT + 1
+
+class TicTacToe:
+    """Board, turn and result, with no dependency on the display.
+
+    step() is the only way the state changes, so the same object drives
+    the window, the computer opponent and headless scripted games.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.reset()
+
+    def reset(self):
+        self.board = [[None for _ in range(self.cols)] for _ in range(self.rows)]
+        self.player = 'X'
+        self.game_over = False
+        self.winner = None
+        self.win_line = None  # End cells ((row, col), (row, col)) of the winning line
+        self.moves = 0
+
+    def available_square(self, row, col):
+        return self.board[row][col] is None
+
+    def is_board_full(self):
+        return self.moves == self.rows * self.cols
+
+    def step(self, row, col):
+        """Play the current player's mark at (row, col).
+
+        Returns False and leaves the state untouched if the move is illegal.
+        """
+        if self.game_over or not (0 <= row < self.rows and 0 <= col < self.cols) \
+                or self.board[row][col] is not None:
+            return False
+        
+        self.board[row][col] = self.player
+        self.moves += 1
+        # Only lines through the new mark can have changed, and nobody can
+        # have k in a row before their k-th mark
+        if self.moves >= 2 * self.k - 1:
+            self.win_line = winning_line_at(self.board, row, col, self.k)
+        if self.win_line:
+            self.game_over = True
+            self.winner = self.player
+        elif self.is_board_full():
+            self.game_over = True
+            self.winner = None
+        else:
+            self.player = 'O' if self.player == 'X' else 'X'
         return True
 
-    # Descending diagonal win check
-    if board[0][0] == player and board[1][1] == player and board[2][2] == player:
-        draw_desc_diagonal(player)
+def play_scripted_games(games, seed=None, rows=3, cols=3, k=3):
+    """Play random games without a display; returns wins per side (None for draws)."""
+    rng = random.Random(seed)
+    game = TicTacToe(rows, cols, k)
+    cells = [(row, col) for row in range(rows) for col in range(cols)]
+    results = {'X': 0, 'O': 0, None: 0}
+    for _ in range(games):
+        game.reset()
+        rng.shuffle(cells)
+        for row, col in cells:
+            game.step(row, col)
+            if game.game_over:
+                break
+        results[game.winner] += 1
+    return results
+
+class GameWindow:
+    """pygame front end: renders a TicTacToe game and feeds it clicks.
+
+    The board is shown through a viewport (BOARD_RECT) that can be zoomed
+    with the mouse wheel and scrolled with the arrow keys or a right-drag,
+    so only the visible cells are ever drawn.
+    """
+
+    def __init__(self, game, cpu_player=None, budget_ms=1000):
+        self.game = game
+        
+        # Initialize pygame and set up the display
+        pygame.init()
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption('Tic Tac Toe')
+        self.screen.fill(BG_COLOR)
+        
+        # Fonts
+        self.font = pygame.font.SysFont('Arial', 40)
+        self.small_font = pygame.font.SysFont('Arial', 30)
+        
+        # Pre-rendered surfaces: a frame is just blits of these
+        self.figure_surfaces = {}  # (mark, cell size) -> glyph
+        self.grid_surfaces = {}  # cell size -> (horizontal lines, vertical lines)
+        self.button_surfaces = {False: self.build_button_surface(BUTTON_COLOR),
+                                True: self.build_button_surface(BUTTON_HOVER_COLOR)}
+        self.status_surfaces = {}
+        
+        # Viewport: cell size in pixels and the board pixel shown at BOARD_RECT's top-left
+        self.cell_size = max(MIN_CELL_SIZE, min(MAX_CELL_SIZE, BOARD_SIZE // max(game.rows, game.cols)))
+        self.offset_x = 0
+        self.offset_y = 0
+        self.drag_start = None
+        self.clamp_view()
+        
+        # Computer opponent: searches on a worker thread and hands moves back through a queue
+        self.cpu_player = cpu_player
+        self.ai_requests = queue.Queue()
+        self.ai_results = queue.Queue()
+        self.ai_thinking = False
+        self.ai_failed = False  # The last search raised; the human plays the computer's move
+        self.game_id = 0  # Bumped on restart so moves for an abandoned game are dropped
+        self.ai = None
+        self.ai_thread = None
+        self.closing = False  # Set by quit; the worker stops posting events once pygame is going away
+        if cpu_player:
+            self.ai = MCTSPlayer(k=game.k, time_budget_ms=budget_ms)
+            self.ai_thread = threading.Thread(target=self.ai_worker, daemon=True)
+            self.ai_thread.start()
+
+    def build_figure_surface(self, mark, size):
+        # Transparent background so a winning line stays visible underneath
+        surface = pygame.Surface((size, size), pygame.SRCALPHA).convert_alpha()
+        scale = size / GRID_SIZE
+        space = size // 4
+        if mark == 'O':
+            pygame.draw.circle(surface, CIRCLE_COLOR, (size // 2, size // 2), 
+                              size // 3, max(1, round(CIRCLE_WIDTH * scale)))
+        else:
+            width = max(1, round(CROSS_WIDTH * scale))
+            pygame.draw.line(surface, CROSS_COLOR, (space, space), 
+                            (size - space, size - space), width)
+            pygame.draw.line(surface, CROSS_COLOR, (space, size - space), 
+                            (size - space, space), width)
+        return surface
+
+    def build_grid_surfaces(self, size):
+        # One cell larger than the viewport on every side, so any scroll offset is a single blit
+        width = max(1, round(LINE_WIDTH * size / GRID_SIZE))
+        span = (BOARD_RECT.width + 2 * size, BOARD_RECT.height + 2 * size)
+        horizontal = pygame.Surface(span).convert()
+        vertical = pygame.Surface(span).convert()
+        for surface in (horizontal, vertical):
+            surface.fill(BG_COLOR)
+            surface.set_colorkey(BG_COLOR, pygame.RLEACCEL)
+        for y in range(0, span[1], size):
+            pygame.draw.line(horizontal, LINE_COLOR, (0, y), (span[0], y), width)
+        for x in range(0, span[0], size):
+            pygame.draw.line(vertical, LINE_COLOR, (x, 0), (x, span[1]), width)
+        return horizontal, vertical
+
+    def grid_surface(self):
+        # The grid is rendered once per zoom level
+        surfaces = self.grid_surfaces.get(self.cell_size)
+        if surfaces is None:
+            surfaces = self.grid_surfaces[self.cell_size] = self.build_grid_surfaces(self.cell_size)
+        return surfaces
+
+    def figure_surface(self, mark):
+        # Glyphs are rendered once per zoom level
+        key = (mark, self.cell_size)
+        surface = self.figure_surfaces.get(key)
+        if surface is None:
+            surface = self.figure_surfaces[key] = self.build_figure_surface(mark, self.cell_size)
+        return surface
+
+    def build_button_surface(self, color):
+        surface = pygame.Surface(BUTTON_RECT.size, pygame.SRCALPHA).convert_alpha()
+        rect = surface.get_rect()
+        pygame.draw.rect(surface, color, rect, border_radius=10)
+        pygame.draw.rect(surface, (255, 255, 255), rect, 2, border_radius=10)
+        
+        text = self.small_font.render("RESTART", True, TEXT_COLOR)
+        surface.blit(text, (rect.centerx - text.get_width() // 2, 
+                            rect.centery - text.get_height() // 2))
+        return surface
+
+    def render_status(self, text):
+        # Each distinct status line is rendered once
+        surface = self.status_surfaces.get(text)
+        if surface is None:
+            surface = self.status_surfaces[text] = self.font.render(text, True, TEXT_COLOR).convert_alpha()
+        return surface
+
+    def clamp_view(self):
+        """Centre boards smaller than the viewport; otherwise keep the view on the board."""
+        board_w = self.game.cols * self.cell_size
+        board_h = self.game.rows * self.cell_size
+        if board_w <= BOARD_RECT.width:
+            self.offset_x = -(BOARD_RECT.width - board_w) // 2
+        else:
+            self.offset_x = max(0, min(self.offset_x, board_w - BOARD_RECT.width))
+        if board_h <= BOARD_RECT.height:
+            self.offset_y = -(BOARD_RECT.height - board_h) // 2
+        else:
+            self.offset_y = max(0, min(self.offset_y, board_h - BOARD_RECT.height))
+
+    def zoom(self, steps, pos):
+        """Zoom by wheel steps, keeping the board point under pos fixed."""
+        old_size = self.cell_size
+        new_size = round(old_size * ZOOM_STEP ** steps)
+        if new_size == old_size:
+            new_size += 1 if steps > 0 else -1
+        self.cell_size = max(MIN_CELL_SIZE, min(MAX_CELL_SIZE, new_size))
+        if self.cell_size == old_size:
+            return False
+        
+        anchor_x = pos[0] - BOARD_RECT.x
+        anchor_y = pos[1] - BOARD_RECT.y
+        self.offset_x = (self.offset_x + anchor_x) * self.cell_size // old_size - anchor_x
+        self.offset_y = (self.offset_y + anchor_y) * self.cell_size // old_size - anchor_y
+        self.clamp_view()
         return True
 
-    return False
+    def scroll(self, dx, dy):
+        old = (self.offset_x, self.offset_y)
+        self.offset_x += dx
+        self.offset_y += dy
+        self.clamp_view()
+        return (self.offset_x, self.offset_y) != old
 
-def draw_vertical_winning_line(col, player):
-    posX = col * GRID_SIZE + 75 + GRID_SIZE // 2
-    
-    color = CIRCLE_COLOR if player == 'O' else CROSS_COLOR
-    pygame.draw.line(screen, color, (posX, 95), (posX, 75 + BOARD_SIZE - 15), 15)
+    def cell_at(self, pos):
+        """Map a screen position to a (row, col) on the board, or None."""
+        if not BOARD_RECT.collidepoint(pos):
+            return None
+        row = (pos[1] - BOARD_RECT.y + self.offset_y) // self.cell_size
+        col = (pos[0] - BOARD_RECT.x + self.offset_x) // self.cell_size
+        if 0 <= row < self.game.rows and 0 <= col < self.game.cols:
+            return row, col
+        return None
 
-def draw_horizontal_winning_line(row, player):
-    posY = row * GRID_SIZE + 75 + GRID_SIZE // 2
-    
-    color = CIRCLE_COLOR if player == 'O' else CROSS_COLOR
-    pygame.draw.line(screen, color, (95, posY), (75 + BOARD_SIZE - 15, posY), 15)
-
-def draw_asc_diagonal(player):
-    color = CIRCLE_COLOR if player == 'O' else CROSS_COLOR
-    pygame.draw.line(screen, color, (110, 75 + BOARD_SIZE - 15), (75 + BOARD_SIZE - 15, 95), 15)
-
-def draw_desc_diagonal(player):
-    color = CIRCLE_COLOR if player == 'O' else CROSS_COLOR
-    pygame.draw.line(screen, color, (110, 95), (75 + BOARD_SIZE - 15, 75 + BOARD_SIZE - 15), 15)
-
-def restart():
-    screen.fill(BG_COLOR)
-    draw_lines()
-    for row in range(3):
-        for col in range(3):
-            board[row][col] = None
-
-def draw_status():
-    # Draw current player indicator
-    if not game_over:
-        text = font.render(f"Player {player}'s Turn", True, TEXT_COLOR)
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 20))
-    else:
-        if winner:
-            text = font.render(f"Player {winner} Wins!", True, TEXT_COLOR)
+    def cell_rect(self, row, col):
+        return pygame.Rect(BOARD_RECT.x + col * self.cell_size - self.offset_x,
+                           BOARD_RECT.y + row * self.cell_size - self.offset_y,
+                           self.cell_size, self.cell_size)
+
+    def visible_cells(self):
+        """Row and column ranges that intersect the viewport."""
+        size = self.cell_size
+        first_row = max(0, self.offset_y // size)
+        first_col = max(0, self.offset_x // size)
+        last_row = min(self.game.rows, (self.offset_y + BOARD_RECT.height - 1) // size + 1)
+        last_col = min(self.game.cols, (self.offset_x + BOARD_RECT.width - 1) // size + 1)
+        return range(first_row, last_row), range(first_col, last_col)
+
+    def draw_lines(self):
+        # Interior grid lines only: the horizontal lines are clipped short of the board's
+        # top and bottom edges, the vertical ones short of its left and right edges
+        size = self.cell_size
+        horizontal, vertical = self.grid_surface()
+        dest = (BOARD_RECT.x - size - self.offset_x % size, BOARD_RECT.y - size - self.offset_y % size)
+        board = pygame.Rect(BOARD_RECT.x - self.offset_x, BOARD_RECT.y - self.offset_y,
+                            self.game.cols * size, self.game.rows * size)
+        inner = board.inflate(-(size // 2) * 2, -(size // 2) * 2)
+        
+        self.screen.set_clip(BOARD_RECT.clip((board.x, inner.y, board.width, inner.height)))
+        self.screen.blit(horizontal, dest)
+        self.screen.set_clip(BOARD_RECT.clip((inner.x, board.y, inner.width, board.height)))
+        self.screen.blit(vertical, dest)
+        self.screen.set_clip(BOARD_RECT)
+
+    def draw_figure(self, row, col):
+        cell_rect = self.cell_rect(row, col)
+        mark = self.game.board[row][col]
+        if mark is not None:
+            self.screen.set_clip(BOARD_RECT)
+            self.screen.blit(self.figure_surface(mark), cell_rect)
+            self.screen.set_clip(None)
+        
+        # Region to pass to pygame.display.update
+        return cell_rect.clip(BOARD_RECT)
+
+    def draw_board(self):
+        """Repaint the viewport: grid, winning line and marks in the visible cells."""
+        rows, cols = self.visible_cells()
+        self.screen.set_clip(BOARD_RECT)
+        self.screen.fill(BG_COLOR, BOARD_RECT)
+        self.draw_lines()
+        if self.game.win_line:
+            self.draw_winning_line()
+        board = self.game.board
+        for row in rows:
+            board_row = board[row]
+            for col in cols:
+                if board_row[col] is not None:
+                    self.screen.blit(self.figure_surface(board_row[col]), self.cell_rect(row, col))
+        self.screen.set_clip(None)
+        return BOARD_RECT
+
+    def draw_winning_line(self):
+        (start_row, start_col), (end_row, end_col) = self.game.win_line
+        start = self.cell_rect(start_row, start_col).center
+        end = self.cell_rect(end_row, end_col).center
+        
+        # Extend past the end cells' centres, stopping short of their far edges
+        reach = self.cell_size // 2 - 20 * self.cell_size // GRID_SIZE
+        step_x = (end_col > start_col) - (end_col < start_col)
+        step_y = (end_row > start_row) - (end_row < start_row)
+        start = (start[0] - step_x * reach, start[1] - step_y * reach)
+        end = (end[0] + step_x * reach, end[1] + step_y * reach)
+        
+        color = CIRCLE_COLOR if self.game.winner == 'O' else CROSS_COLOR
+        self.screen.set_clip(BOARD_RECT)
+        pygame.draw.line(self.screen, color, start, end, max(1, round(15 * self.cell_size / GRID_SIZE)))
+        self.screen.set_clip(None)
+
+    def restart(self):
+        self.game.reset()
+        self.game_id += 1
+        self.ai_thinking = False
+        self.ai_failed = False
+        self.screen.fill(BG_COLOR)
+        self.draw_board()
+
+    def draw_status(self):
+        game = self.game
+        self.screen.fill(BG_COLOR, STATUS_RECT)
+        
+        # Draw current player indicator
+        if not game.game_over and self.ai_thinking:
+            text = self.render_status("Computer is thinking...")
+        elif not game.game_over and self.ai_failed:
+            text = self.render_status("Computer failed: your move")
+        elif not game.game_over:
+            text = self.render_status(f"Player {game.player}'s Turn")
+        elif game.winner:
+            text = self.render_status(f"Player {game.winner} Wins!")
         else:
-            text = font.render("Game Over: Draw!", True, TEXT_COLOR)
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 20))
+            text = self.render_status("Game Over: Draw!")
+        self.screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 20))
+        
+        return STATUS_RECT
 
-def draw_restart_button():
-    button_rect = pygame.Rect(WIDTH // 2 - 75, HEIGHT - 70, 150, 50)
-    mouse_pos = pygame.mouse.get_pos()
-    
-    # Change color if mouse is hovering over button
-    if button_rect.collidepoint(mouse_pos):
-        pygame.draw.rect(screen, BUTTON_HOVER_COLOR, button_rect, border_radius=10)
-    else:
-        pygame.draw.rect(screen, BUTTON_COLOR, button_rect, border_radius=10)
-    
-    pygame.draw.rect(screen, (255, 255, 255), button_rect, 2, border_radius=10)
-    
-    text = small_font.render("RESTART", True, TEXT_COLOR)
-    screen.blit(text, (button_rect.centerx - text.get_width() // 2, 
-                      button_rect.centery - text.get_height() // 2))
-    
-    return button_rect
+    def draw_restart_button(self, hovered=None):
+        button_rect = BUTTON_RECT
+        if hovered is None:
+            hovered = button_rect.collidepoint(pygame.mouse.get_pos())
+        
+        # Change color if mouse is hovering over button
+        self.screen.blit(self.button_surfaces[bool(hovered)], button_rect)
+        return button_rect
 
-# Draw initial board
-draw_lines()
+    def apply_move(self, row, col):
+        """Play a move on the game; returns the regions that changed."""
+        if not self.game.step(row, col):
+            return []
+        if self.game.win_line:
+            # The winning line may cross many cells; redraw the view with marks over it
+            return [self.draw_board()]
+        
+        # Only the new mark needs blitting
+        return [self.draw_figure(row, col)]
+
+    def ai_worker(self):
+        while True:
+            job = self.ai_requests.get()
+            if job is None:
+                break
+            job_id, snapshot, mark = job
+            try:
+                move = self.ai.choose_move(snapshot, mark)
+            except Exception:
+                # Report it and post a None move so the main loop stops waiting
+                traceback.print_exc()
+                move = None
+            if self.closing:
+                break
+            self.ai_results.put((job_id, move))
+            # Wake the main loop, which is blocked in pygame.event.wait
+            pygame.event.post(pygame.event.Event(AI_MOVE_EVENT))
+
+    def request_ai_move(self):
+        """Ask the worker for a move if it is the computer's turn."""
+        game = self.game
+        if self.cpu_player == game.player and not game.game_over and not self.ai_thinking:
+            self.ai_thinking = True
+            self.ai_failed = False
+            self.ai_requests.put((self.game_id, [row[:] for row in game.board], game.player))
 
-# Main game loop
-while True:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
+    def quit(self):
+        self.closing = True
+        self.ai_requests.put(None)
+        if self.ai:
+            # Stop a search in progress before its process pool is shut down under it
+            self.ai.cancel()
+            self.ai_thread.join(timeout=2)
+            self.ai.close()
+        pygame.quit()
+        sys.exit()
+
+    def run(self):
+        game = self.game
+        scroll_keys = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0),
+                       pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
+        
+        # Draw initial board
+        self.draw_board()
+        self.request_ai_move()
+        self.draw_status()
+        button_rect = self.draw_restart_button()
+        button_hovered = button_rect.collidepoint(pygame.mouse.get_pos())
+        pygame.display.update()
         
-        if event.type == pygame.MOUSEBUTTONDOWN and not game_over:
-            mouseX = event.pos[0]  # x coordinate
-            mouseY = event.pos[1]  # y coordinate
+        # Main game loop: sleep until an event arrives, then repaint only what changed
+        while True:
+            event = pygame.event.wait()
+            dirty = []
+            full_update = False
             
-            # Check if click is within the board area
-            if 75 <= mouseX <= 75 + BOARD_SIZE and 75 <= mouseY <= 75 + BOARD_SIZE:
-                clicked_row = (mouseY - 75) // GRID_SIZE
-                clicked_col = (mouseX - 75) // GRID_SIZE
+            if event.type == pygame.QUIT:
+                self.quit()
+            
+            if event.type == pygame.WINDOWEXPOSED:
+                full_update = True
+            
+            # Only repaint the button when the hover state flips
+            if event.type == pygame.MOUSEMOTION:
+                hovered = button_rect.collidepoint(event.pos)
+                if hovered != button_hovered:
+                    button_hovered = hovered
+                    dirty.append(self.draw_restart_button(hovered))
                 
-                if available_square(clicked_row, clicked_col):
-                    mark_square(clicked_row, clicked_col, player)
-                    if check_win(player):
-                        game_over = True
-                        winner = player
-                    elif is_board_full():
-                        game_over = True
-                        winner = None
-                    else:
-                        player = 'O' if player == 'X' else 'X'
-                    
-                    draw_figures()
-        
-        # Handle restart button click
-        if event.type == pygame.MOUSEBUTTONDOWN and game_over:
-            button_rect = draw_restart_button()
-            if button_rect.collidepoint(event.pos):
-                restart()
-                game_over = False
-                player = 'X'
-                winner = None
+                # Right-drag scrolls the viewport
+                if self.drag_start is not None:
+                    dx = self.drag_start[0] - event.pos[0]
+                    dy = self.drag_start[1] - event.pos[1]
+                    self.drag_start = event.pos
+                    if self.scroll(dx, dy):
+                        dirty.append(self.draw_board())
+            
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+                self.drag_start = event.pos
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 3:
+                self.drag_start = None
+            
+            if event.type == pygame.MOUSEWHEEL and event.y:
+                if self.zoom(event.y, pygame.mouse.get_pos()):
+                    dirty.append(self.draw_board())
+            
+            if event.type == pygame.KEYDOWN and event.key in scroll_keys:
+                dx, dy = scroll_keys[event.key]
+                if self.scroll(dx * self.cell_size, dy * self.cell_size):
+                    dirty.append(self.draw_board())
+            
+            # Computer move arrived from the worker thread
+            if event.type == AI_MOVE_EVENT:
+                while not self.ai_results.empty():
+                    job_id, move = self.ai_results.get()
+                    if job_id == self.game_id and self.ai_thinking:
+                        self.ai_thinking = False
+                        if move is None:
+                            self.ai_failed = True
+                        else:
+                            dirty.extend(self.apply_move(*move))
+                        dirty.append(self.draw_status())
+            
+            is_click = event.type == pygame.MOUSEBUTTONDOWN and event.button == 1
+            if is_click and not game.game_over and not self.ai_thinking:
+                # Check if click is within the board area
+                cell = self.cell_at(event.pos)
+                if cell and game.available_square(*cell):
+                    dirty.extend(self.apply_move(*cell))
+                    self.request_ai_move()
+                    dirty.append(self.draw_status())
+            
+            # Handle restart button click
+            elif is_click and game.game_over:
+                if button_rect.collidepoint(event.pos):
+                    self.restart()
+                    self.request_ai_move()
+                    self.draw_status()
+                    self.draw_restart_button(button_hovered)
+                    full_update = True
+            
+            # Update display
+            if full_update:
+                pygame.display.update()
+            elif dirty:
+                pygame.display.update(dirty)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic Tac Toe")
+    parser.add_argument("--rows", type=int, default=3, help="board height")
+    parser.add_argument("--cols", type=int, default=3, help="board width")
+    parser.add_argument("--k", type=int, default=3, help="marks in a row needed to win")
+    parser.add_argument("--cpu", choices=['X', 'O'], help="let the computer play this side")
+    parser.add_argument("--budget", type=int, default=1000, help="computer thinking time per move in ms")
+    parser.add_argument("--headless", type=int, metavar="GAMES",
+                        help="play GAMES random games without opening a window and report throughput")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for --headless")
+    args = parser.parse_args()
+    if args.rows < 1 or args.cols < 1 or not 1 <= args.k <= max(args.rows, args.cols):
+        parser.error("need rows, cols >= 1 and 1 <= k <= max(rows, cols)")
     
-    # Update display
-    draw_status()
-    draw_figures()
-    button_rect = draw_restart_button()
-    pygame.display.update()
\ No newline at end of file
+    if args.headless is not None:
+        start = time.perf_counter()
+        results = play_scripted_games(args.headless, args.seed, args.rows, args.cols, args.k)
+        elapsed = time.perf_counter() - start
+        print(f"{args.headless:,} games in {elapsed:.2f}s ({args.headless / elapsed * 60:,.0f} games/min)")
+        print(f"X wins {results['X']:,}, O wins {results['O']:,}, draws {results[None]:,}")
+        return
+    
+    GameWindow(TicTacToe(args.rows, args.cols, args.k), args.cpu, args.budget).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import time
+
+import numpy as np
+
+from tictac_1 import NO_MOVE, load_table
+
+# Cells are numbered 0-8 row by row; each row of LINES is one winning line
+LINES = np.array([
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Rows
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Columns
+    [0, 4, 8], [2, 4, 6],             # Diagonals
+])
+# Same digit order as tictac_1.board_key (first cell most significant)
+KEY_WEIGHTS = 3 ** np.arange(8, -1, -1)
+POLICIES = ('random', 'perfect')
+CHUNK_SIZE = 200_000
+
+def random_moves(boards, rng):
+    """Pick a uniformly random empty cell on every board."""
+    keys = rng.random(boards.shape)
+    keys[boards != 0] = -1.0
+    return keys.argmax(axis=1)
+
+def perfect_moves(boards, table, rng, epsilon=0.0):
+    """Look up the perfect-play move for every board, playing randomly with probability epsilon."""
+    moves = (table[boards @ KEY_WEIGHTS] & 0x0F).astype(np.intp)
+    if epsilon > 0:
+        blunder = rng.random(len(boards)) < epsilon
+        moves[blunder] = random_moves(boards[blunder], rng)
+    if (moves == NO_MOVE).any():
+        raise ValueError("Perfect-play table has no move for an unfinished board")
+    return moves
+
+def play_batch(games, policies, rng, table=None, epsilon=0.0):
+    """Play `games` complete games side by side.
+
+    policies maps 'X' and 'O' to 'random' or 'perfect'. Returns the winner
+    of every game (0 draw, 1 X, 2 O) and X's opening cell.
+    """
+    boards = np.zeros((games, 9), dtype=np.int8)
+    winners = np.zeros(games, dtype=np.int8)
+    openings = None
+    active = np.arange(games)
+    for ply in range(9):
+        player = 1 if ply % 2 == 0 else 2
+        current = boards[active]
+        if policies['X' if player == 1 else 'O'] == 'perfect':
+            moves = perfect_moves(current, table, rng, epsilon)
+        else:
+            moves = random_moves(current, rng)
+        current[np.arange(len(active)), moves] = player
+        boards[active] = current
+        if ply == 0:
+            openings = moves
+
+        won = (current[:, LINES] == player).all(axis=2).any(axis=1)
+        winners[active[won]] = player
+        active = active[~won]
+        if not len(active):
+            break
+    return winners, openings
+
+def simulate(games, x_policy='random', o_policy='random', epsilon=0.0, seed=None):
+    """Play many games in chunks and collect outcome and first-move statistics."""
+    if games < 1:
+        raise ValueError(f"Need at least one game to simulate, got {games}")
+    for policy in (x_policy, o_policy):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}; expected one of {', '.join(POLICIES)}")
+    rng = np.random.default_rng(seed)
+    table = None
+    if 'perfect' in (x_policy, o_policy):
+        table = np.frombuffer(load_table(), dtype=np.uint8)
+    policies = {'X': x_policy, 'O': o_policy}
+
+    # outcomes[first cell, result] with results ordered draw, X win, O win
+    outcomes = np.zeros((9, 3), dtype=np.int64)
+    start = time.perf_counter()
+    remaining = games
+    while remaining > 0:
+        chunk = min(CHUNK_SIZE, remaining)
+        winners, openings = play_batch(chunk, policies, rng, table, epsilon)
+        np.add.at(outcomes, (openings, winners), 1)
+        remaining -= chunk
+    elapsed = time.perf_counter() - start
+    return {'games': games, 'seconds': elapsed, 'outcomes': outcomes}
+
+def print_report(stats):
+    """Print win/draw/loss distributions overall and per opening cell."""
+    games = stats['games']
+    outcomes = stats['outcomes']
+    draws, x_wins, o_wins = outcomes.sum(axis=0)
+    print(f"{games:,} games in {stats['seconds']:.2f}s "
+          f"({games / stats['seconds'] * 60:,.0f} games/min)")
+    print(f"X wins {x_wins / games:7.2%}   O wins {o_wins / games:7.2%}   Draws {draws / games:7.2%}")
+    print()
+    print("First move   Played    X wins    O wins     Draws")
+    for cell in range(9):
+        played = outcomes[cell].sum()
+        if not played:
+            continue
+        draws, x_wins, o_wins = outcomes[cell] / played
+        print(f"{cell + 1:>10} {played / games:8.2%} {x_wins:9.2%} {o_wins:9.2%} {draws:9.2%}")
@@ -0,0 +1,279 @@
+import argparse
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from tictac_1 import check_win_at, new_board, print_board
+
+def other(player):
+    return 'O' if player == 'X' else 'X'
+
+def normalize(board):
+    """Copy a tictac_1 (' ') or tictac_2 (None) board into tictac_1 form."""
+    return [[cell or ' ' for cell in row] for row in board]
+
+def rollout_batch(board, player, k, count, seed):
+    """Play count random games from board with player to move.
+
+    Runs inside the worker processes; returns (X wins, O wins, draws).
+    """
+    rng = random.Random(seed)
+    empties = [(r, c) for r, row in enumerate(board) for c, cell in enumerate(row) if cell == ' ']
+    results = {'X': 0, 'O': 0, None: 0}
+    for _ in range(count):
+        scratch = [row[:] for row in board]
+        rng.shuffle(empties)
+        current = player
+        winner = None
+        for r, c in empties:
+            scratch[r][c] = current
+            if check_win_at(scratch, r, c, k):
+                winner = current
+                break
+            current = other(current)
+        results[winner] += 1
+    return results['X'], results['O'], results[None]
+
+class Node:
+    """Search tree node; wins are counted for the player who made `move`."""
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried', 'terminal',
+                 'visits', 'wins', 'pending')
+
+    def __init__(self, move, player, parent, untried, terminal=None):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.terminal = terminal  # 'X', 'O' or 'draw' once the game is over here
+        self.visits = 0
+        self.wins = 0.0
+        self.pending = 0  # Playouts in flight, counted as losses (virtual loss)
+
+    def select_child(self, exploration):
+        log_total = math.log(self.visits + self.pending + 1)
+        best, best_score = None, -1.0
+        for child in self.children:
+            n = child.visits + child.pending
+            if n == 0:
+                return child
+            score = child.wins / n + exploration * math.sqrt(log_total / n)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+class MCTSPlayer:
+    """Monte Carlo tree search opponent with a per-move time budget.
+
+    Selection and expansion run in this process; batches of random
+    rollouts are farmed out to a process pool, with virtual loss keeping
+    concurrent playouts on different branches. The tree is kept between
+    moves and re-rooted at the position the next call is made from.
+    """
+
+    def __init__(self, k=3, time_budget_ms=1000, workers=None, rollouts_per_task=16,
+                 exploration=1.4, seed=None):
+        self.k = k
+        self.time_budget_ms = time_budget_ms
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.rollouts_per_task = rollouts_per_task
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.pool = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+        self.root = None
+        self.root_board = None
+        self.total_playouts = 0
+        self.total_seconds = 0.0
+        self.last_playouts = 0
+        self.last_seconds = 0.0
+        self.last_reused = 0
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop the running search, and any later one, from another thread."""
+        self.cancelled.set()
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def playouts_per_second(self):
+        return self.last_playouts / self.last_seconds if self.last_seconds else 0.0
+
+    @property
+    def total_playouts_per_second(self):
+        return self.total_playouts / self.total_seconds if self.total_seconds else 0.0
+
+    def _new_node(self, board, move, player, parent):
+        terminal = None
+        if move and check_win_at(board, move[0], move[1], self.k):
+            terminal = player
+        untried = [] if terminal else [(r, c) for r, row in enumerate(board)
+                                       for c, cell in enumerate(row) if cell == ' ']
+        if not terminal and not untried:
+            terminal = 'draw'
+        self.rng.shuffle(untried)
+        return Node(move, player, parent, untried, terminal)
+
+    def _reroot(self, board, player):
+        """Reuse the subtree matching board if the old tree reaches it."""
+        node = self.root
+        if node is not None and len(board) == len(self.root_board) \
+                and len(board[0]) == len(self.root_board[0]):
+            added = {(r, c) for r, row in enumerate(board) for c, cell in enumerate(row)
+                     if cell != self.root_board[r][c]}
+            if all(self.root_board[r][c] == ' ' for r, c in added):
+                while added and node is not None:
+                    node = next((child for child in node.children
+                                 if child.move in added and board[child.move[0]][child.move[1]] == child.player),
+                                None)
+                    if node is not None:
+                        added.discard(node.move)
+                if node is not None and not added and other(node.player) == player:
+                    node.parent = None
+                    self.root, self.root_board = node, board
+                    return node.visits
+
+        self.root = self._new_node(board, None, other(player), None)
+        self.root_board = board
+        return 0
+
+    def _backpropagate(self, node, x_wins, o_wins, draws, pending):
+        count = x_wins + o_wins + draws
+        while node is not None:
+            node.visits += count
+            node.pending -= pending
+            node.wins += (x_wins if node.player == 'X' else o_wins) + 0.5 * draws
+            node = node.parent
+
+    def _select(self, board):
+        """Descend from the root and expand one leaf, playing moves onto board."""
+        node = self.root
+        while not node.untried and node.children and node.terminal is None:
+            node = node.select_child(self.exploration)
+            board[node.move[0]][node.move[1]] = node.player
+        if node.untried and node.terminal is None:
+            r, c = node.untried.pop()
+            player = other(node.player)
+            board[r][c] = player
+            child = self._new_node(board, (r, c), player, node)
+            node.children.append(child)
+            node = child
+        return node
+
+    def choose_move(self, board, player):
+        """Search for up to the time budget and return (row, col) for player.
+
+        Returns None if cancel() was called before the search finished.
+        """
+        board = normalize(board)
+        start = time.perf_counter()
+        deadline = start + self.time_budget_ms / 1000
+        self.last_reused = self._reroot(board, player)
+        root = self.root
+        if root.terminal is not None:
+            raise ValueError("The game is already over")
+
+        playouts = 0
+        backups = 0  # playout batches and terminal leaves backed up; terminal leaves are not playouts
+        in_flight = {}
+        max_in_flight = 2 * self.workers if self.pool else 1
+        # Always back up at least one leaf, so the root has a child to pick even on a zero budget
+        while (not backups or time.perf_counter() < deadline) and not self.cancelled.is_set():
+            # Keep the pool saturated
+            for _ in range(max_in_flight - len(in_flight)):
+                scratch = [row[:] for row in board]
+                leaf = self._select(scratch)
+                if leaf.terminal is not None:
+                    winner = leaf.terminal
+                    self._backpropagate(leaf, winner == 'X', winner == 'O', winner == 'draw', 0)
+                    backups += 1
+                elif self.pool is None:
+                    results = rollout_batch(scratch, other(leaf.player), self.k,
+                                            self.rollouts_per_task, self.rng.getrandbits(32))
+                    self._backpropagate(leaf, *results, 0)
+                    playouts += self.rollouts_per_task
+                    backups += 1
+                else:
+                    future = self.pool.submit(rollout_batch, scratch, other(leaf.player), self.k,
+                                              self.rollouts_per_task, self.rng.getrandbits(32))
+                    node = leaf
+                    while node is not None:
+                        node.pending += self.rollouts_per_task
+                        node = node.parent
+                    in_flight[future] = leaf
+
+            if in_flight:
+                timeout = max(0.0, deadline - time.perf_counter()) if backups else None
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    leaf = in_flight.pop(future)
+                    self._backpropagate(leaf, *future.result(), self.rollouts_per_task)
+                    playouts += self.rollouts_per_task
+                    backups += 1
+
+        # Abandon batches still running at the deadline and undo their virtual loss
+        for future, leaf in in_flight.items():
+            future.cancel()
+            self._backpropagate(leaf, 0, 0, 0, self.rollouts_per_task)
+
+        elapsed = time.perf_counter() - start
+        self.last_playouts = playouts
+        self.last_seconds = elapsed
+        self.total_playouts += playouts
+        self.total_seconds += elapsed
+        if self.cancelled.is_set():
+            return None
+
+        best = max(root.children, key=lambda child: (child.visits, child.wins))
+        # Re-root on our own move so the next call can keep this subtree
+        next_board = [row[:] for row in board]
+        next_board[best.move[0]][best.move[1]] = player
+        best.parent = None
+        self.root, self.root_board = best, next_board
+        return best.move
+
+def self_play(rows, cols, k, time_budget_ms, workers):
+    """Play one MCTS-vs-MCTS game, printing throughput after every move."""
+    board = new_board(rows, cols)
+    player = 'X'
+    with MCTSPlayer(k, time_budget_ms, workers) as x_ai, MCTSPlayer(k, time_budget_ms, workers) as o_ai:
+        for move_count in range(1, rows * cols + 1):
+            ai = x_ai if player == 'X' else o_ai
+            row, col = ai.choose_move(board, player)
+            board[row][col] = player
+            print(f"{player} plays {row * cols + col + 1}: {ai.last_playouts} playouts, "
+                  f"{ai.playouts_per_second:,.0f} playouts/s, {ai.last_reused} reused")
+            if check_win_at(board, row, col, k):
+                print_board(board)
+                print(f"Player {player} wins!")
+                break
+            player = other(player)
+        else:
+            print_board(board)
+            print("It's a tie!")
+
+        for name, ai in (('X', x_ai), ('O', o_ai)):
+            print(f"{name}: {ai.total_playouts} playouts, {ai.total_playouts_per_second:,.0f} playouts/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MCTS self-play for m,n,k Tic Tac Toe")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--budget", type=int, default=1000, help="time budget per move in ms")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="rollout processes (default: one per core, 0 to run in-process)")
+    args = parser.parse_args()
+    self_play(args.rows, args.cols, args.k, args.budget, args.workers)
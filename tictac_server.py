@@ -0,0 +1,195 @@
+import argparse
+import asyncio
+import random
+import time
+
+from tictac_1 import check_win, computer_move, is_board_full, load_table, new_board, parse_move
+
+# Line protocol (one reply line per request line):
+#   server greets     HELLO tictac 1
+#   NEW [X|O]         start a game as X (default) or O -> OK, or MOVE n when the server opens
+#   MOVE n            play cell n (1-9)               -> MOVE m, END X|O|DRAW [m], or ERR reason
+#   BOARD             current position                -> BOARD <9 chars, '.' for empty>
+#   QUIT              close the session               -> BYE
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+def raise_fd_limit():
+    """Allow as many sockets as the hard limit permits (thousands of sessions)."""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+class Session:
+    """One client's game against the server, independent of the transport."""
+
+    def __init__(self, table, opponent='table', rng=None):
+        self.table = table
+        self.opponent = opponent
+        self.rng = rng or random.Random()
+        self.board = None
+        self.client = None
+
+    def server_move(self):
+        server = 'O' if self.client == 'X' else 'X'
+        if self.opponent == 'table':
+            row, col = computer_move(self.board, self.table)
+        else:
+            row, col = self.rng.choice([(r, c) for r in range(3) for c in range(3)
+                                        if self.board[r][c] == ' '])
+        self.board[row][col] = server
+        move = str(row * 3 + col + 1)
+        if check_win(self.board, server):
+            self.board = None
+            return f"END {server} {move}"
+        if is_board_full(self.board):
+            self.board = None
+            return f"END DRAW {move}"
+        return f"MOVE {move}"
+
+    def handle(self, line):
+        """Apply one request line and return the reply line."""
+        command, _, arg = line.strip().partition(' ')
+        command = command.upper()
+        arg = arg.strip()
+
+        if command == 'NEW':
+            side = arg.upper() or 'X'
+            if side not in ('X', 'O'):
+                return "ERR side must be X or O"
+            self.board = new_board()
+            self.client = side
+            return self.server_move() if side == 'O' else "OK"
+
+        if command == 'MOVE':
+            if self.board is None:
+                return "ERR no game in progress"
+            try:
+                row, col = parse_move(self.board, arg)
+            except ValueError as e:
+                return f"ERR {e}"
+            self.board[row][col] = self.client
+            if check_win(self.board, self.client):
+                self.board = None
+                return f"END {self.client}"
+            if is_board_full(self.board):
+                self.board = None
+                return "END DRAW"
+            return self.server_move()
+
+        if command == 'BOARD':
+            if self.board is None:
+                return "ERR no game in progress"
+            return "BOARD " + ''.join(cell if cell != ' ' else '.' for row in self.board for cell in row)
+
+        if command == 'QUIT':
+            return "BYE"
+
+        return "ERR unknown command"
+
+async def handle_client(reader, writer, table, opponent, stats):
+    session = Session(table, opponent)
+    stats['sessions'] += 1
+    stats['active'] += 1
+    writer.write(b"HELLO tictac 1\n")
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            reply = session.handle(line.decode('ascii', errors='replace'))
+            stats['requests'] += 1
+            writer.write(reply.encode('ascii') + b"\n")
+            if reply == "BYE":
+                break
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        stats['active'] -= 1
+        writer.close()
+
+async def serve(host, port, opponent):
+    raise_fd_limit()
+    table = load_table()
+    stats = {'sessions': 0, 'active': 0, 'requests': 0}
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_client(reader, writer, table, opponent, stats),
+        host, port, backlog=4096)
+    print(f"Serving Tic Tac Toe on {host}:{port}")
+    async with server:
+        try:
+            await server.serve_forever()
+        finally:
+            print(f"{stats['sessions']} sessions, {stats['requests']} requests served")
+
+async def bench_client(host, port, deadline, latencies, totals, rng):
+    """Play random games until the deadline, timing every MOVE round trip."""
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readline()  # HELLO
+    try:
+        while time.perf_counter() < deadline:
+            writer.write(b"NEW X\n")
+            await reader.readline()
+            free = list(range(1, 10))
+            while True:
+                move = rng.choice(free)
+                free.remove(move)
+                start = time.perf_counter()
+                writer.write(f"MOVE {move}\n".encode('ascii'))
+                reply = (await reader.readline()).decode('ascii').split()
+                latencies.append(time.perf_counter() - start)
+                totals['moves'] += 1
+                if reply[0] == 'END':
+                    totals['games'] += 1
+                    break
+                if reply[0] != 'MOVE':
+                    raise RuntimeError(f"unexpected reply {' '.join(reply)!r}")
+                free.remove(int(reply[1]))
+        writer.write(b"QUIT\n")
+        await reader.readline()
+    finally:
+        writer.close()
+
+async def bench(host, port, clients, duration, seed):
+    raise_fd_limit()
+    rng = random.Random(seed)
+    latencies = []
+    totals = {'moves': 0, 'games': 0}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(bench_client(host, port, deadline, latencies, totals, random.Random(rng.random()))
+                           for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else 0.0
+    print(f"{clients} clients, {elapsed:.1f}s: {totals['games']} games, {totals['moves']} moves")
+    print(f"{totals['moves'] / elapsed:,.0f} moves/s, p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-session Tic Tac Toe server and load generator")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help="host games over TCP")
+    serve_parser.add_argument("--opponent", choices=['table', 'random'], default='table',
+                              help="how the server picks its replies")
+    bench_parser = commands.add_parser('bench', help="load-test a running server")
+    bench_parser.add_argument("--clients", type=int, default=1000, help="concurrent connections")
+    bench_parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    bench_parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'serve':
+            asyncio.run(serve(args.host, args.port, args.opponent))
+        else:
+            asyncio.run(bench(args.host, args.port, args.clients, args.duration, args.seed))
+    except KeyboardInterrupt:
+        pass